@@ -14,21 +14,144 @@
          ├── index.html
          ├── css/
          └── ...
-     → распаковывается во временную папку, затем перемещается в _workdir/<имя_архива>/
+     → распаковывается напрямую в _workdir/<имя_архива>/
 
 Если папка назначения уже существует — удаляется перед распаковкой
 (предыдущий результат обработки заменяется новым).
 """
 from __future__ import annotations
 
+import os
 import shutil
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from core import logger
 
 __all__ = ["unpack_archive"]
 
+# Буфер копирования при распаковке. extractall() использует 16 KiB по умолчанию —
+# на крупных файлах архива это лишние read/write и вызовы zlib.
+EXTRACT_BUFSIZE = (1 if os.name == "nt" else 4) * 1024 * 1024
+
+# Каждый элемент ZIP — независимый deflate-поток, а zlib отпускает GIL,
+# поэтому элементы распаковываются параллельно.
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _member_arcname(filename: str, pathmod=os.path) -> str:
+    """Относительный путь элемента — копия ZipFile._extract_member().
+
+    splitdrive() применяется ко всему имени, затем отбрасываются пустые
+    части, «.» и «..»; при разделителе «\\» (Windows) имя проходит через
+    тот же ZipFile._sanitize_windows_name(), что и у extract().
+    pathmod — os.path, в тестах можно передать ntpath.
+    """
+    sep = pathmod.sep
+    arcname = filename.replace("/", sep)
+    if pathmod.altsep:
+        arcname = arcname.replace(pathmod.altsep, sep)
+    arcname = pathmod.splitdrive(arcname)[1]
+    invalid_parts = ("", pathmod.curdir, pathmod.pardir)
+    arcname = sep.join(part for part in arcname.split(sep) if part not in invalid_parts)
+    if sep == "\\":
+        arcname = zipfile.ZipFile._sanitize_windows_name(arcname, sep)
+    return arcname
+
+
+def _member_destination(
+    info: zipfile.ZipInfo, target: Path, resolved_target: Path
+) -> Path | None:
+    """Возвращает путь назначения для элемента архива.
+
+    Имя санитизируется так же, как в ZipFile.extract() (_member_arcname):
+    обратный слеш на POSIX — часть имени файла, как и у extractall().
+    None — имя пустое или путь (например, через симлинк) выходит за
+    пределы target.
+    """
+    arcname = _member_arcname(info.filename)
+    if not arcname:
+        return None
+    destination = target.joinpath(*arcname.split(os.path.sep))
+    if not destination.resolve().is_relative_to(resolved_target):
+        logger.warn(f"[archive] Пропуск элемента вне папки распаковки: {info.filename}")
+        return None
+    return destination
+
+
+def _copy_member(handle: zipfile.ZipFile, info: zipfile.ZipInfo, destination: Path) -> None:
+    with handle.open(info) as src, open(destination, "wb") as dst:
+        shutil.copyfileobj(src, dst, length=EXTRACT_BUFSIZE)
+
+
+def _extract_all(handle: zipfile.ZipFile, target: Path) -> None:
+    """Распаковывает все элементы архива в target через буфер EXTRACT_BUFSIZE.
+
+    Папки создаются заранее в одном проходе, затем файлы распаковываются
+    в EXTRACT_WORKERS потоках — у каждого потока свой ZipFile на тот же путь
+    (один handle нельзя читать из нескольких потоков одновременно).
+    """
+    # Ключ — путь без учёта регистра: на Windows/macOS «A.css» и «a.css» —
+    # один файл, и два потока не должны писать в него одновременно.
+    members: dict[str, tuple[Path, zipfile.ZipInfo]] = {}
+    resolved_target = target.resolve()
+    for info in handle.infolist():
+        destination = _member_destination(info, target, resolved_target)
+        if destination is None:
+            continue
+        if info.is_dir():
+            destination.mkdir(parents=True, exist_ok=True)
+            continue
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Дубликат имени в архиве: как и extractall(), побеждает последний
+        key = os.path.normcase(str(destination)).casefold()
+        members.pop(key, None)
+        members[key] = (destination, info)
+
+    if EXTRACT_WORKERS <= 1 or len(members) <= 1 or not handle.filename:
+        for destination, info in members.values():
+            _copy_member(handle, info, destination)
+        return
+
+    local = threading.local()
+    opened: list[zipfile.ZipFile] = []
+    opened_lock = threading.Lock()
+
+    def _worker_handle() -> zipfile.ZipFile:
+        worker_handle = getattr(local, "handle", None)
+        if worker_handle is None:
+            worker_handle = zipfile.ZipFile(handle.filename, "r")
+            local.handle = worker_handle
+            with opened_lock:
+                opened.append(worker_handle)
+        return worker_handle
+
+    def _extract_member(info: zipfile.ZipInfo, destination: Path) -> None:
+        _copy_member(_worker_handle(), info, destination)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(EXTRACT_WORKERS, len(members))) as pool:
+            futures = [
+                pool.submit(_extract_member, info, destination)
+                for destination, info in members.values()
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        for worker_handle in opened:
+            worker_handle.close()
+
+
+def _remove_existing_target(target_root: Path) -> None:
+    """Удаляет результат предыдущей распаковки. Без отдельного exists() — сразу rmtree."""
+    try:
+        shutil.rmtree(target_root)
+    except FileNotFoundError:
+        return
+    logger.info(f"[archive] Удалена существующая папка: {target_root.name}")
+
 
 def unpack_archive(archive_path: Path) -> Path | None:
     """Распаковывает архив в родительскую папку и возвращает путь к корню проекта.
@@ -58,26 +181,17 @@ def unpack_archive(archive_path: Path) -> Path | None:
                     f"Обнаружена единственная корневая папка: '{root_name}'. "
                     "Распаковка с сохранением структуры..."
                 )
-                if target_root.exists():
-                    logger.info(f"[archive] Удаляем существующую папку: {target_root.name}")
-                    shutil.rmtree(target_root)
-                handle.extractall(workdir)
+                _remove_existing_target(target_root)
+                _extract_all(handle, workdir)
             else:
                 # Режим 2: файлы в корне архива — оборачиваем в папку по имени архива
                 target_root = workdir / archive_path.stem
-                if target_root.exists():
-                    logger.info(f"[archive] Удаляем существующую папку: {target_root.name}")
-                    shutil.rmtree(target_root)
-
-                # Распаковываем во временную папку, затем переносим
-                tmp_dir = workdir / "_detilda_extract_tmp"
-                if tmp_dir.exists():
-                    shutil.rmtree(tmp_dir)
-                handle.extractall(tmp_dir)
+                _remove_existing_target(target_root)
+
+                # Распаковываем сразу в целевую папку — без временной папки и
+                # повторного переноса каждого корневого элемента
                 target_root.mkdir(parents=True, exist_ok=True)
-                for item in tmp_dir.iterdir():
-                    shutil.move(str(item), target_root / item.name)
-                shutil.rmtree(tmp_dir, ignore_errors=True)
+                _extract_all(handle, target_root)
 
     except zipfile.BadZipFile as exc:
         logger.err(f"💥 Некорректный ZIP-архив: {exc}")
@@ -14,11 +14,13 @@
 from __future__ import annotations
 
 import contextlib
+import contextvars
+import http.client
 import json
 import os
 import re
-import urllib.error
-import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Iterable, Iterator
@@ -26,12 +28,22 @@ from uuid import uuid4
 
 from core import logger, utils
 from core.config_loader import ConfigLoader
-from core.downloader import fetch_bytes, resolve_download_folder
+from core.downloader import (
+    DownloadWriteError,
+    fetch_to_file,
+    prepare_download_rules,
+    resolve_download_folder,
+)
 from core.runtime_scripts import filter_removable_scripts
 
 if TYPE_CHECKING:  # pragma: no cover - type checking helper
     from core.project import ProjectContext
 
+try:  # pragma: no cover - optional dependency
+    import ahocorasick as _ahocorasick  # pyahocorasick: поиск всех ключей за один проход
+except ImportError:  # pragma: no cover - optional dependency
+    _ahocorasick = None
+
 __all__ = ["AssetStats", "rename_and_cleanup_assets"]
 
 
@@ -58,47 +70,234 @@ class ResourceCopyRule:
     if_missing: bool = False  # копировать только если destination не существует
 
 
+# Предел кэша текстов файлов на один проход rename_and_cleanup_assets — по
+# суммарному st_size файлов на диске, а не по длине str
+_TEXT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class _TextCache:
+    """LRU-кэш текстов файлов между сканированием ссылок и нормализацией регистра.
+
+    Живёт в пределах одного вызова rename_and_cleanup_assets (web-сервис
+    обрабатывает проекты конкурентно — общий модульный кэш смешал бы их).
+    Запись проверяется по (st_mtime_ns, st_size): изменённый или удалённый
+    файл читается с диска заново.
+    """
+
+    def __init__(self, max_bytes: int = _TEXT_CACHE_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: OrderedDict[Path, tuple[int, int, str]] = OrderedDict()
+
+    def read(self, path: Path) -> str:
+        stat = path.stat()
+        cached = self._entries.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            self._entries.move_to_end(path)
+            return cached[2]
+        self.discard(path)
+        text = utils.safe_read(path)
+        if stat.st_size <= self._max_bytes:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, text)
+            self._bytes += stat.st_size
+            while self._bytes > self._max_bytes:
+                _path, (_mtime, evicted_size, _text) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return text
+
+    def move(self, old: Path, new: Path) -> None:
+        """Переносит запись при переименовании файла (mtime при rename не меняется)."""
+        cached = self._entries.pop(old, None)
+        if cached is not None:
+            # Запись под new (заменённый файл) больше не актуальна
+            self.discard(new)
+            self._entries[new] = cached
+
+    def discard(self, path: Path) -> None:
+        cached = self._entries.pop(path, None)
+        if cached is not None:
+            self._bytes -= cached[1]
+
+
+# Ведущие "./" (подряд), затем ведущие "/" — тот же порядок, что у прежних циклов while
+_CONFIG_PATH_PREFIX_PATTERN = re.compile(r"^(?:\./)*/*")
+
+
 def _normalize_config_path(value: str) -> str:
     """Нормализует путь из конфига: убирает ./ и ведущие слеши."""
     normalized = value.strip().replace("\\", "/")
-    while normalized.startswith("./"):
-        normalized = normalized[2:]
-    while normalized.startswith("/"):
-        normalized = normalized[1:]
-    return normalized
+    # Обычно путь уже без префикса — regex не запускаем
+    if not normalized.startswith(("./", "/")):
+        return normalized
+    return _CONFIG_PATH_PREFIX_PATTERN.sub("", normalized, count=1)
+
+
+# Один проход str.translate вместо цепочки .replace(): пробел → "_", скобки и запятые удаляются
+_SANITIZE_TABLE = str.maketrans({" ": "_", "(": None, ")": None, ",": None})
+_UNDERSCORE_RUN_PATTERN = re.compile(r"_{2,}")
 
 
 def _sanitize(name: str) -> str:
     """Очищает имя файла: убирает спецсимволы, схлопывает множественные подчёркивания."""
-    sanitized = (
-        name.replace(" ", "_")
-        .replace("(", "")
-        .replace(")", "")
-        .replace(",", "")
-        .replace("&", "and")
-    )
-    return re.sub(r"_+", "_", sanitized)
+    sanitized = name.replace("&", "and").translate(_SANITIZE_TABLE)
+    if "__" not in sanitized:
+        return sanitized
+    return _UNDERSCORE_RUN_PATTERN.sub("_", sanitized)
 
 
+# Сколько ошибок переименования логировать по отдельности; остальные — одной сводкой
+_RENAME_ERROR_LOG_LIMIT = 20
+
+# Переименование til→ai в главном цикле. Отдельное имя модуля: тесты подменяют
+# его, не трогая os.replace для остального процесса
+_replace_file = os.replace
+
+# Скачивание удалённых ассетов упирается в latency сети, а не в CPU —
+# запросы выполняются параллельно в нескольких потоках.
+_DOWNLOAD_WORKERS = 16
+
+# Символы, которые urlsplit() отбрасывает в начале URL (C0-управляющие и пробел)
+_URL_LEADING_STRIP = "".join(chr(code) for code in range(0x21))
+
+# Префикс относительной ссылки перед именем файла: ./ ../ .\ ..\ / \
+_CASE_LINK_PREFIX = r"(?:\./|\.\./|\.\\|\.\.\\|/|\\)"
+
 _RELATIVE_LINK_LOWERCASE_PATTERN = re.compile(
     r"(?<!:)(?P<prefix>(?:\./|\.\./|/|\\)+)(?P<path>[A-Za-z0-9._\-\\/]+)"
 )
 
 
-def _iter_links(text: str, link_patterns: Iterable[str]) -> Iterator[str]:
+# Паттерн вида "\btil" / "^til": якоря без ширины + литерал. Для таких паттернов
+# литерал обязателен в имени, и regex можно не запускать, если его там нет.
+_LITERAL_FILENAME_PATTERN = re.compile(r"(?:\\b|\^)*(?P<literal>[A-Za-z0-9_]+)")
+
+
+def _required_literal(pattern: str) -> str | None:
+    """Возвращает обязательный литерал паттерна (lowercase) или None, если его не выделить."""
+    match = _LITERAL_FILENAME_PATTERN.fullmatch(pattern)
+    return match.group("literal").lower() if match else None
+
+
+def _sorted_project_files(project_root: Path) -> list[tuple[os.DirEntry[str], str]]:
+    """Возвращает файлы проекта как (DirEntry, relpath) в порядке sorted(rglob("*")).
+
+    Обход через utils.iter_files (os.scandir) — без лишнего stat() на файл.
+    Сортировка по частям пути сохраняет прежний детерминированный порядок.
+    """
+    return sorted(utils.iter_files(project_root), key=lambda item: item[1].split("/"))
+
+
+def _split_name(name: str) -> tuple[str, str]:
+    """(stem, suffix) имени файла по правилам Path.stem/Path.suffix, без создания Path."""
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[:dot], name[dot:]
+    return name, ""
+
+
+def _root_prefix(project_root: Path) -> str:
+    """Префикс путей внутри проекта для _project_relpath(): "<root>/"."""
+    return os.path.join(os.fspath(project_root), "")
+
+
+def _project_relpath(path: str | Path, root_prefix: str) -> str:
+    """utils.relpath() для пути внутри проекта — срез строки вместо resolve().
+
+    resolve() делает системные вызовы на каждый компонент пути; пути из обхода
+    проекта и так начинаются с root_prefix. Остальные — через utils.relpath().
+    """
+    path_str = os.fspath(path)
+    if path_str.startswith(root_prefix):
+        return path_str[len(root_prefix):].replace("\\", "/")
+    return utils.relpath(path_str, root_prefix)
+
+
+def _entry_inode(entry: os.DirEntry[str]) -> int:
+    """inode файла для сортировки чтения. На Windows inode() делает отдельный stat — не используем."""
+    return 0 if os.name == "nt" else entry.inode()
+
+
+def _compile_link_pattern(pattern: str) -> re.Pattern[str]:
+    """Компилирует паттерн ссылки из config.yaml."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# Байты, на которых bytes-паттерн ведёт себя иначе, чем str-версия после
+# safe_read(): \x1c-\x1f — пробельные для str-\s, но не для bytes-\s;
+# "\r" safe_read() переводит в "\n". Такие файлы идут текстовым путём.
+_BYTES_SCAN_UNSAFE_RE = re.compile(rb"[\r\x1c-\x1f]")
+
+
+def _compile_link_pattern_bytes(pattern: str) -> re.Pattern[bytes] | None:
+    """bytes-версия паттерна ссылки для сканирования ASCII-файлов без декодирования.
+
+    None — паттерн содержит не-ASCII символы: bytes-версия не эквивалентна str.
+    На ASCII-тексте \\b, \\w и IGNORECASE совпадают в обоих режимах, а \\s —
+    только без байтов \\x1c-\\x1f (см. _BYTES_SCAN_UNSAFE_RE).
+    """
+    if not pattern.isascii():
+        return None
+    return re.compile(pattern.encode("ascii"), re.IGNORECASE)
+
+
+def _compile_case_pattern(keys: tuple[str, ...]) -> re.Pattern[str]:
+    """Одна альтернатива старых имён с префиксом ссылки. keys — в порядке приоритета."""
+    alternation = "|".join(re.escape(old) for old in keys)
+    return re.compile(rf"(?P<prefix>{_CASE_LINK_PREFIX}*)(?P<old>{alternation})")
+
+
+def _compile_link_patterns(link_patterns: Iterable[str]) -> list[re.Pattern[str]]:
+    """Компилирует паттерны ссылок из config.yaml один раз на весь обход файлов."""
+    compiled: list[re.Pattern[str]] = []
     for pattern in link_patterns:
         try:
-            regex = re.compile(pattern, re.IGNORECASE)
+            compiled.append(_compile_link_pattern(pattern))
         except re.error:
             logger.warn(f"[assets] Некорректный паттерн ссылки: {pattern}")
-            continue
+    return compiled
+
+
+def _iter_links(text: str, compiled: Iterable[re.Pattern[str]]) -> Iterator[str]:
+    for regex in compiled:
         for match in regex.finditer(text):
             link = match.groupdict().get("link")
             if link:
                 yield link
 
 
+def _compile_link_patterns_bytes(link_patterns: Iterable[str]) -> list[re.Pattern[bytes]] | None:
+    """bytes-версии тех же паттернов, что и _compile_link_patterns.
+
+    None — хотя бы один паттерн не ASCII или не компилируется как bytes
+    (например, \\uXXXX или (?u)): тогда все файлы идут текстовым путём, иначе
+    ссылки этого паттерна в ASCII-файлах потерялись бы.
+    """
+    compiled: list[re.Pattern[bytes]] = []
+    for pattern in link_patterns:
+        try:
+            regex = _compile_link_pattern_bytes(pattern)
+        except re.error:
+            return None
+        if regex is None:
+            return None
+        compiled.append(regex)
+    return compiled
+
+
+def _iter_links_bytes(data: bytes, compiled: Iterable[re.Pattern[bytes]]) -> Iterator[str]:
+    # data — чистый ASCII (проверено вызывающим кодом), decode не падает
+    for regex in compiled:
+        for match in regex.finditer(data):
+            link = match.groupdict().get("link")
+            if link:
+                yield link.decode("ascii")
+
+
 def _lowercase_relative_links(text: str) -> tuple[str, bool]:
+    # Без "/" и "\\" в тексте нет ни одного префикса ссылки — regex не запускаем
+    if "/" not in text and "\\" not in text:
+        return text, False
+
     def _replacement(match: re.Match[str]) -> str:
         path = match.group("path")
         lower_path = path.lower()
@@ -110,17 +309,35 @@ def _lowercase_relative_links(text: str) -> tuple[str, bool]:
     return new_text, bool(count)
 
 
-
-
-def _download_remote_assets(project_root: Path, loader: ConfigLoader) -> tuple[int, int, int]:
-    remote_cfg = loader.service_files().remote_assets
-    rules_raw = [{"folder": r.folder, "extensions": list(r.extensions)} for r in remote_cfg.rules]
-    if not rules_raw:
+def _download_remote_assets(
+    project_root: Path,
+    patterns_cfg: object,
+    service_cfg: object,
+    base_dir: Path,
+    text_cache: _TextCache | None = None,
+    cached_suffixes: tuple[str, ...] = (),
+) -> tuple[int, int, int]:
+    """Скачивает ресурсы Tilda, на которые ссылаются текстовые файлы проекта.
+
+    Файлы с расширением из cached_suffixes читаются как текст через text_cache —
+    их потом перечитает нормализация регистра. Остальные сканируются как bytes:
+    если файл и паттерны — чистый ASCII, декодирование в str не нужно.
+    Секции конфига передаются уже загруженными; base_dir — корень deTilda,
+    от него считается remote_assets.cache_dir.
+    """
+    remote_cfg = service_cfg.remote_assets  # type: ignore[union-attr]
+    # Правила канонизируются один раз, а не для каждого URL в resolve_download_folder
+    download_rules = prepare_download_rules(
+        [{"folder": r.folder, "extensions": list(r.extensions)} for r in remote_cfg.rules]
+    )
+    if not download_rules:
         return 0, 0, 0
 
-    link_patterns = loader.patterns().links
+    link_patterns = patterns_cfg.links  # type: ignore[union-attr]
     if not link_patterns:
         return 0, 0, 0
+    compiled_link_patterns = _compile_link_patterns(link_patterns)
+    compiled_link_patterns_bytes = _compile_link_patterns_bytes(link_patterns)
 
     scan_exts = remote_cfg.scan_extensions or []
     if scan_exts:
@@ -129,54 +346,120 @@ def _download_remote_assets(project_root: Path, loader: ConfigLoader) -> tuple[i
         files = utils.list_files_recursive(project_root)
 
     urls: set[str] = set()
+    urls_add = urls.add
     for file_path in files:
-        try:
-            text = utils.safe_read(file_path)
-        except Exception:
-            continue
+        links: Iterator[str]
+        if compiled_link_patterns_bytes is not None and not (
+            text_cache is not None and utils.has_extension(file_path.name, cached_suffixes)
+        ):
+            try:
+                data = file_path.read_bytes()
+            except Exception:
+                continue
+            # Нужны только ссылки с "til": если подстроки нет во всём файле,
+            # её нет ни в одной ссылке — regex-паттерны по файлу не запускаем
+            if b"til" not in data.lower():
+                continue
+            if data.isascii() and not _BYTES_SCAN_UNSAFE_RE.search(data):
+                links = _iter_links_bytes(data, compiled_link_patterns_bytes)
+            else:
+                # Уже прочитанные bytes декодируются так же, как в safe_read()
+                try:
+                    text = utils.decode_text(data)
+                except Exception:
+                    continue
+                links = _iter_links(text, compiled_link_patterns)
+        else:
+            try:
+                text = (
+                    text_cache.read(file_path)
+                    if text_cache is not None
+                    else utils.safe_read(file_path)
+                )
+            except Exception:
+                continue
+
+            if "til" not in text.lower():
+                continue
+            links = _iter_links(text, compiled_link_patterns)
 
-        for link in _iter_links(text, link_patterns):
-            if "til" not in link.lower():
+        for link in links:
+            link_lower = link.lower()
+            if "til" not in link_lower:
                 continue
-            parsed = urllib.parse.urlsplit(link if not link.startswith("//") else f"https:{link}")
-            if parsed.scheme not in {"http", "https"}:
+            # Схема http/https — через startswith вместо urlsplit(); lstrip
+            # повторяет отбрасывание ведущих C0/пробелов в urlsplit()
+            if not (
+                link.startswith("//")
+                or link_lower.lstrip(_URL_LEADING_STRIP).startswith(("http:", "https:"))
+            ):
                 continue
-            urls.add(link)
+            urls_add(link)
 
-    downloaded = 0
-    warnings = 0
-    ssl_bypassed_downloads = 0
+    root_prefix = _root_prefix(project_root)
+    jobs: list[tuple[str, Path]] = []
+    planned: set[Path] = set()
     for url in sorted(urls):
-        result = resolve_download_folder(url, rules_raw)
+        result = resolve_download_folder(url, download_rules)
         if result is None:
             continue
         folder, filename = result
         destination_path = project_root / folder / filename
-        if destination_path.exists():
+        # Несколько URL с одинаковым именем файла — скачиваем только первый
+        if destination_path in planned or destination_path.exists():
             continue
+        planned.add(destination_path)
+        jobs.append((url, destination_path))
+
+    # Папки создаём заранее в одном потоке, до запуска загрузок
+    for destination_dir in sorted({path.parent for _url, path in jobs}):
         try:
-            payload, used_insecure_retry = fetch_bytes(url)
-        except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as exc:
-            logger.warn(f"[assets] Не удалось скачать {url}: {exc}")
-            continue
-        except Exception as exc:  # pragma: no cover
-            logger.warn(f"[assets] Неожиданная ошибка скачивания {url}: {exc}")
-            continue
+            destination_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as exc:
+            logger.err(f"[assets] Ошибка создания папки {destination_dir}: {exc}")
 
-        if used_insecure_retry:
-            ssl_bypassed_downloads += 1
+    cache_dir = base_dir / remote_cfg.cache_dir if remote_cfg.cache_dir else None
 
+    def _download(url: str, destination_path: Path) -> bool | None:
+        """Скачивает и сохраняет один ресурс. None — ошибка (уже залогирована)."""
         try:
-            destination_path.parent.mkdir(parents=True, exist_ok=True)
-            destination_path.write_bytes(payload)
-        except Exception as exc:
+            return fetch_to_file(url, destination_path, cache_dir=cache_dir)
+        except DownloadWriteError as exc:
             logger.err(f"[assets] Ошибка записи {destination_path}: {exc}")
-            continue
+            return None
+        except (OSError, http.client.HTTPException) as exc:
+            # URLError, таймаут, обрыв соединения посреди тела (в т.ч. SSL) —
+            # это сбой скачивания, а не записи
+            logger.warn(f"[assets] Не удалось скачать {url}: {exc}")
+            return None
+        except Exception as exc:  # pragma: no cover
+            logger.warn(f"[assets] Неожиданная ошибка скачивания {url}: {exc}")
+            return None
 
-        downloaded += 1
-        logger.info(
-            f"🌐 Загружен ресурс: {url} → {utils.relpath(destination_path, project_root)}"
-        )
+    downloaded = 0
+    warnings = 0
+    ssl_bypassed_downloads = 0
+    if not jobs:
+        return downloaded, warnings, ssl_bypassed_downloads
+
+    with ThreadPoolExecutor(max_workers=min(_DOWNLOAD_WORKERS, len(jobs))) as pool:
+        # copy_context(): логгер хранит лог-файл проекта в ContextVar,
+        # без копии контекста сообщения из потоков не попадут в лог проекта
+        futures = [
+            pool.submit(contextvars.copy_context().run, _download, url, path)
+            for url, path in jobs
+        ]
+        # Результаты собираем в порядке sorted(urls) — лог остаётся детерминированным
+        for (url, destination_path), future in zip(jobs, futures):
+            used_insecure_retry = future.result()
+            if used_insecure_retry is None:
+                continue
+            if used_insecure_retry:
+                ssl_bypassed_downloads += 1
+            downloaded += 1
+            logger.info(
+                f"🌐 Загружен ресурс: {url} → {_project_relpath(destination_path, root_prefix)}"
+            )
 
     return downloaded, warnings, ssl_bypassed_downloads
 
@@ -191,6 +474,35 @@ def _normalize_case_enabled(service_cfg: object) -> tuple[bool, set[str]]:
     return enabled, extensions
 
 
+def _lowercase_pass_suffixes(patterns_cfg: object, service_cfg: object) -> tuple[str, ...]:
+    """Расширения файлов, которые _apply_case_normalization всегда читает целиком.
+
+    Это HTML/CSS под lowercase-проходом; JS и PHP читаются, только если в них
+    есть старые имена файлов.
+    """
+    enabled, _extensions = _normalize_case_enabled(service_cfg)
+    lowercase_enabled = bool(
+        service_cfg.pipeline_stages.normalize_case.lowercase_relative_links  # type: ignore[union-attr]
+    )
+    if not enabled or not lowercase_enabled:
+        return ()
+    text_extensions = tuple(
+        ext for ext in patterns_cfg.text_extensions  # type: ignore[union-attr]
+        if isinstance(ext, str)
+    ) or (".html", ".htm", ".css", ".js", ".php", ".txt")
+    return tuple(
+        ext for ext in utils.extension_suffixes(text_extensions) if ext not in (".js", ".php")
+    )
+
+
+def _is_same_file(path: str, other: str) -> bool:
+    """os.path.samefile() без исключения: False, если один из путей недоступен."""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
 def _rename_with_case_handling(path: Path, destination: Path) -> Path | None:
     """Rename *path* to *destination*, handling case-only updates safely."""
 
@@ -232,6 +544,7 @@ def _apply_case_normalization(
     stats: AssetStats,
     patterns_cfg: object,
     service_cfg: object,
+    text_cache: _TextCache | None = None,
 ) -> None:
     """Приводит имена файлов к нижнему регистру и обновляет ссылки в текстовых файлах.
 
@@ -250,49 +563,72 @@ def _apply_case_normalization(
     if not text_extensions:
         text_extensions = (".html", ".htm", ".css", ".js", ".php", ".txt")
 
-    case_updates: Dict[str, str] = {}
+    # Обратный индекс {значение: [ключи]} для rename_map: перенаправление
+    # записей на новое имя без полного прохода по карте на каждый файл.
+    # Индекс допускает устаревшие ключи — они отсеиваются проверкой значения.
+    value_index: Dict[str, list[str]] = {}
+    for key, value in rename_map.items():
+        value_index.setdefault(value, []).append(key)
 
-    for path in sorted(project_root.rglob("*")):
-        if not path.is_file():
-            continue
-        suffix = path.suffix.lower()
-        if suffix not in extensions:
-            continue
+    def _set_mapping(key: str, value: str) -> None:
+        rename_map[key] = value
+        value_index.setdefault(value, []).append(key)
+
+    def _retarget_values(old_value: str, new_value: str) -> None:
+        """Все ключи, указывавшие на old_value, перенаправляет на new_value."""
+        for key in value_index.pop(old_value, ()):
+            if rename_map.get(key) == old_value:
+                _set_mapping(key, new_value)
 
-        lower_name = path.name.lower()
-        if lower_name == path.name:
+    case_updates: Dict[str, str] = {}
+    # Текстовые файлы собираем в том же обходе, что и переименования, —
+    # второй обход дерева для обновления ссылок не нужен.
+    # Храним inode: rename не меняет inode, а чтение в порядке inode
+    # ближе к физическому расположению файлов на диске.
+    text_files: list[tuple[int, Path, str]] = []
+    root_prefix = _root_prefix(project_root)
+
+    case_suffixes = utils.extension_suffixes(tuple(extensions))
+    text_suffixes = utils.extension_suffixes(text_extensions)
+
+    for entry, old_rel in _sorted_project_files(project_root):
+        old_name = entry.name
+        is_text = utils.has_extension(old_name, text_suffixes)
+        lower_name = old_name.lower()
+        if lower_name == old_name or not utils.has_extension(old_name, case_suffixes):
+            if is_text:
+                text_files.append((_entry_inode(entry), Path(entry.path), old_rel))
             continue
 
-        old_rel = utils.relpath(path, project_root)
-        old_name = path.name
+        path = Path(entry.path)
         new_path = path.with_name(lower_name)
         renamed = _rename_with_case_handling(path, new_path)
         if renamed is None:
             logger.warn(
                 f"[assets] Пропуск нормализации регистра из-за конфликта: {old_rel}"
             )
+            if is_text:
+                text_files.append((_entry_inode(entry), path, old_rel))
             continue
+        if text_cache is not None:
+            text_cache.move(path, new_path)
+        new_rel = old_rel[: len(old_rel) - len(old_name)] + lower_name
+        if is_text:
+            text_files.append((_entry_inode(entry), new_path, new_rel))
 
-        new_rel = utils.relpath(new_path, project_root)
-
-        rename_map[old_rel] = new_rel
-        rename_map[old_name] = new_path.name
-        for key, value in list(rename_map.items()):
-            if value == old_rel:
-                rename_map[key] = new_rel
-            elif value == old_name:
-                rename_map[key] = new_path.name
+        _set_mapping(old_rel, new_rel)
+        _set_mapping(old_name, new_path.name)
+        _retarget_values(old_rel, new_rel)
+        _retarget_values(old_name, new_path.name)
 
         case_updates[old_rel] = new_rel
         case_updates[old_name] = new_path.name
         if "/" in old_rel:
             windows_old = old_rel.replace("/", "\\")
             windows_new = new_rel.replace("/", "\\")
-            rename_map[windows_old] = windows_new
+            _set_mapping(windows_old, windows_new)
             case_updates[windows_old] = windows_new
-            for key, value in list(rename_map.items()):
-                if value == windows_old:
-                    rename_map[key] = windows_new
+            _retarget_values(windows_old, windows_new)
 
         stats.renamed += 1
         logger.info(
@@ -322,55 +658,96 @@ def _apply_case_normalization(
                 extra_replacements.setdefault(old_root, new_root)
         replacements.update(extra_replacements)
 
-    replacement_patterns: list[tuple[str, str, re.Pattern[str]]] = []
-    for old, new in replacements.items():
-        if not old:
-            continue
-        pattern = re.compile(
-            rf"(?P<prefix>(?:\./|\.\./|\.\\|..\\|/|\\)*){re.escape(old)}"
-        )
-        replacement_patterns.append((old, new, pattern))
+    # Все замены объединены в одну альтернативу: один проход regex по файлу
+    # вместо отдельного subn на каждую пару. Длинные ключи идут первыми,
+    # чтобы "Photo.JPG" побеждал "Photo".
+    case_mapping = {old: new for old, new in replacements.items() if old}
+    case_keys = tuple(sorted(case_mapping, key=len, reverse=True))
+
+    # Альтернатива из сотен ключей в re проверяет их по очереди в каждой
+    # позиции текста. Поэтому сначала находим ключи, которые есть в файле,
+    # и строим альтернативу только из них: отсутствующий ключ не совпадёт
+    # нигде, результат замены тот же. С pyahocorasick поиск — один проход.
+    automaton = None
+    if case_keys and _ahocorasick is not None:
+        automaton = _ahocorasick.Automaton()
+        for old in case_keys:
+            automaton.add_word(old, old)
+        automaton.make_automaton()
+
+    def _present_case_keys(text: str) -> tuple[str, ...]:
+        """Ключи case_mapping, которые встречаются в text, в порядке case_keys."""
+        if automaton is not None:
+            found = {old for _end, old in automaton.iter(text)}
+            return tuple(old for old in case_keys if old in found)
+        return tuple(old for old in case_keys if old in text)
+
+    def _case_replacement(match: re.Match[str]) -> str:
+        return f"{match.group('prefix')}{case_mapping[match.group('old')]}"
+
+    lowercase_enabled = bool(
+        service_cfg.pipeline_stages.normalize_case.lowercase_relative_links  # type: ignore[union-attr]
+    )
+    if not case_mapping and not lowercase_enabled:
+        logger.info("🔡 Переименований нет, приведение ссылок к нижнему регистру отключено")
+        return
 
     links_updated = False
 
-    for file_path in utils.list_files_recursive(project_root, extensions=text_extensions):
+    case_needles = [old.encode("utf-8") for old in case_mapping]
+
+    # Файлы обрабатываются независимо друг от друга, поэтому порядок чтения
+    # не влияет на результат; лог обновлённых файлов выводится по пути.
+    if os.name != "nt":
+        text_files.sort(key=lambda item: item[0])
+    updated_files: list[str] = []
+
+    for _inode, file_path, file_rel in text_files:
+        # _lowercase_relative_links применять ТОЛЬКО к HTML/CSS — в JS он
+        # ошибочно lowercase'ит identifiers (например `colAmount/sizerWidth` →
+        # `colAmount/sizerwidth`) и payload base64-строк
+        # (`/yH5BAEAAAA` → `/yh5baeaaa`), что ломает скрипты.
+        lowercase_links = lowercase_enabled and file_path.suffix.lower() not in (".js", ".php")
+        # Без lowercase-прохода файл меняется только заменами case_mapping —
+        # если ни одного старого имени в нём нет (проверка через mmap), не читаем.
+        if not lowercase_links and not utils.file_contains_any(file_path, case_needles):
+            continue
+
         try:
-            original_text = utils.safe_read(file_path)
+            original_text = (
+                text_cache.read(file_path) if text_cache is not None else utils.safe_read(file_path)
+            )
         except Exception as exc:
             logger.warn(f"[assets] Пропуск обновления ссылок в {file_path.name}: {exc}")
             continue
 
         new_text = original_text
         changed = False
-        for old, new, pattern in replacement_patterns:
-            if old not in new_text:
-                continue
-
-            def _replacement(match: re.Match[str], *, _new=new) -> str:
-                return f"{match.group('prefix')}{_new}"
-
-            new_text, count = pattern.subn(_replacement, new_text)
+        present_keys = _present_case_keys(new_text) if case_keys else ()
+        if present_keys:
+            new_text, count = _compile_case_pattern(present_keys).subn(
+                _case_replacement, new_text
+            )
             if count:
                 changed = True
 
-        # _lowercase_relative_links применять ТОЛЬКО к HTML/CSS — в JS он
-        # ошибочно lowercase'ит identifiers (например `colAmount/sizerWidth` →
-        # `colAmount/sizerwidth`) и payload base64-строк
-        # (`/yH5BAEAAAA` → `/yh5baeaaa`), что ломает скрипты.
-        if file_path.suffix.lower() not in (".js", ".php"):
+        if lowercase_links:
             new_text, lowered = _lowercase_relative_links(new_text)
             if lowered:
                 changed = True
 
         if changed and new_text != original_text:
+            if text_cache is not None:
+                text_cache.discard(file_path)
             utils.safe_write(file_path, new_text)
             links_updated = True
-            logger.info(
-                f"🔡 Обновлены ссылки (нижний регистр): {utils.relpath(file_path, project_root)}"
-            )
+            updated_files.append(file_rel)
+
+    for relative in sorted(updated_files, key=lambda value: value.split("/")):
+        logger.info(f"🔡 Обновлены ссылки (нижний регистр): {relative}")
 
     if not links_updated:
-        if replacement_patterns:
+        if case_mapping:
             logger.info(
                 "🔡 Ссылки (нижний регистр) уже соответствуют именам файлов, изменений не потребовалось"
             )
@@ -380,20 +757,38 @@ def _apply_case_normalization(
             )
 
 
-def _ensure_1px_placeholder(project_root: Path) -> None:
+# Прозрачный PNG 1×1 — замена для логотипов Tilda в HTML
+_PLACEHOLDER_RELPATH = "images/1px.png"
+_PLACEHOLDER_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\x0cIDATx\x9cc``\x00\x00"
+    b"\x00\x02\x00\x01\xe2!\xbc3\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+def _ensure_1px_placeholder(project_root: Path, *, known_present: bool = False) -> None:
     """Создаёт прозрачный 1px PNG если его ещё нет.
 
     Используется как замена для логотипов Tilda в HTML (refs.py replace_links_with_1px).
+    known_present=True — обход проекта уже видел файл и не удалял его, stat не нужен.
     """
-    placeholder = project_root / "images" / "1px.png"
-    if not placeholder.exists():
+    if known_present:
+        return
+    placeholder = project_root / _PLACEHOLDER_RELPATH
+    # open("xb") — проверка и создание одним syscall, без гонки exists() → write
+    try:
+        handle = placeholder.open("xb")
+    except FileExistsError:
+        return
+    except FileNotFoundError:
         placeholder.parent.mkdir(parents=True, exist_ok=True)
-        placeholder.write_bytes(
-            b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
-            b"\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\x0cIDATx\x9cc``\x00\x00"
-            b"\x00\x02\x00\x01\xe2!\xbc3\x00\x00\x00\x00IEND\xaeB`\x82"
-        )
-        logger.info(f"🧩 Добавлен placeholder: {utils.relpath(placeholder, project_root)}")
+        try:
+            handle = placeholder.open("xb")
+        except FileExistsError:
+            return
+    with handle:
+        handle.write(_PLACEHOLDER_PNG)
+    logger.info(f"🧩 Добавлен placeholder: {utils.relpath(placeholder, project_root)}")
 
 
 def _copy_resource_files(
@@ -458,6 +853,8 @@ def _save_rename_map(
                 logger.warn(f"[assets] Не удалось удалить устаревший rename_map.json: {exc}")
 
     try:
+        # Строка собирается до открытия файла: ошибка сериализации не оставит
+        # обрезанный rename_map.json на месте прежнего
         utils.safe_write(
             mapping_path,
             json.dumps(rename_map, ensure_ascii=False, indent=2, sort_keys=True),
@@ -501,13 +898,22 @@ def rename_and_cleanup_assets(
     images_cfg = loader.images()
     service_cfg = loader.service_files()
 
+    # Тексты, прочитанные при поиске удалённых ссылок, переиспользуются
+    # нормализацией регистра — без повторного чтения и декодирования
+    text_cache = _TextCache()
     downloaded, download_warnings, ssl_bypassed_downloads = _download_remote_assets(
-        project_root, loader
+        project_root,
+        patterns_cfg,
+        service_cfg,
+        loader.base_dir,
+        text_cache,
+        _lowercase_pass_suffixes(patterns_cfg, service_cfg),
     )
 
-    til_regex = re.compile(
-        str(patterns_cfg.assets.til_to_ai_filename or r"\btil"), re.IGNORECASE
-    )
+    til_pattern = str(patterns_cfg.assets.til_to_ai_filename or r"\btil")
+    til_regex = re.compile(til_pattern, re.IGNORECASE)
+    # Дешёвая проверка подстроки вместо входа в regex для большинства имён без "til"
+    til_literal = _required_literal(til_pattern)
 
     exclude_from_rename = {f.lower() for f in service_cfg.exclude_from_rename.files}
     delete_immediately = {f.lower() for f in images_cfg.delete_physical_files.as_is}
@@ -534,6 +940,12 @@ def rename_and_cleanup_assets(
         )
     delete_service = {name.lower() for name in removable_service_scripts}
 
+    # Шаги 2–3 по точному имени — один поиск в словаре вместо трёх проверок
+    # множеств. Приоритет как у шагов: as_is > service > exclude.
+    name_actions: dict[str, str] = dict.fromkeys(exclude_from_rename, "exclude")
+    name_actions.update(dict.fromkeys(delete_service, "delete_service"))
+    name_actions.update(dict.fromkeys(delete_immediately, "delete_as_is"))
+
     resource_rules: list[ResourceCopyRule] = []
     resource_lookup: dict[str, ResourceCopyRule] = {}
     resource_name_lookup: dict[str, ResourceCopyRule] = {}
@@ -553,6 +965,10 @@ def rename_and_cleanup_assets(
         for original in originals:
             resource_lookup[original.lower()] = rule
             resource_name_lookup[Path(original).name.lower()] = rule
+    # Имя файла, совпавшего по пути или по имени, после strip() всегда есть
+    # в этом множестве — остальные файлы отсекаются одной проверкой, без
+    # нормализации пути regex-ом и двух поисков в словарях
+    resource_names = frozenset(name.strip() for name in resource_name_lookup)
 
     rename_map: Dict[str, str] = {}
     stats = AssetStats(
@@ -561,107 +977,156 @@ def rename_and_cleanup_assets(
         ssl_bypassed_downloads=ssl_bypassed_downloads,
     )
 
+    # Записи rename_map из главного цикла копятся здесь и вливаются одним
+    # update() после обхода — порядок ключей сохраняется, цикл не трогает словарь
+    pending_renames: list[tuple[str, str]] = []
+
     def _handle_resource_replacement(
-        path: Path, relative: str, rename_map: Dict[str, str], stats: AssetStats
+        path: str,
+        name: str,
+        name_lower: str,
+        relative: str,
+        pending: list[tuple[str, str]],
+        stats: AssetStats,
     ) -> bool:
         """Проверяет заменяемые ресурсы (favicon.ico, ga.js).
 
-        Удаляет Tilda-версию файла и добавляет запись в rename_map
+        Удаляет Tilda-версию файла и добавляет запись для rename_map в pending
         чтобы refs.py обновил ссылки на новый путь.
         """
+        if name_lower.strip() not in resource_names:
+            return False
         normalized_relative = _normalize_config_path(relative)
         rule = resource_lookup.get(normalized_relative.lower()) or resource_name_lookup.get(
-            path.name.lower()
+            name_lower
         )
         if not rule:
             return False
         try:
-            path.unlink()
+            os.unlink(path)
         except Exception as exc:
             logger.err(f"[assets] Ошибка удаления {path}: {exc}")
             return False
         stats.removed += 1
-        rename_map[normalized_relative or path.name] = rule.destination
+        pending.append((normalized_relative or name, rule.destination))
         logger.info(
-            f"🧩 Заменён ресурс: {normalized_relative or path.name} → {rule.destination}"
+            f"🧩 Заменён ресурс: {normalized_relative or name} → {rule.destination}"
         )
         return True
 
     # Главный цикл: обходим все файлы проекта в алфавитном порядке
-    for path in sorted(project_root.rglob("*")):
-        if not path.is_file():
-            continue
-
-        relative_path = utils.relpath(path, project_root)
-        
+    root_prefix = _root_prefix(project_root)
+    rename_errors = 0
+    placeholder_present = False
+    for entry, relative_path in _sorted_project_files(project_root):
         # ЗАЩИТА: Игнорируем файлы в системных и тестовых папках, если они попали в рабочий каталог
-        if any(p in relative_path.replace("\\", "/") for p in ("tests/", ".venv/", ".git/", "__pycache__/")):
+        # (relpath из utils.iter_files всегда с "/" — нормализация разделителей не нужна)
+        if any(p in relative_path for p in ("tests/", ".venv/", ".git/", "__pycache__/")):
             continue
 
-        name_lower = path.name.lower()
+        # В цикле — строки и os.*: Path-объект на каждый файл дороже самой файловой операции
+        path = entry.path
+        name = entry.name
+        name_lower = name.lower()
 
         # Шаг 1: замена ресурса (favicon.ico, ga.js) → удалить Tilda-версию, запомнить в rename_map
-        if _handle_resource_replacement(path, relative_path, rename_map, stats):
+        if _handle_resource_replacement(
+            path, name, name_lower, relative_path, pending_renames, stats
+        ):
             continue
 
         # Шаг 2: немедленное удаление мусора (tildacopy.png, Tilda-скрипты и др.)
-        matched_pattern = next(
-            (p for p in delete_patterns if p.fullmatch(name_lower)), None
+        action = name_actions.get(name_lower)
+        # Для as_is паттерн не влияет ни на удаление, ни на сообщение в логе
+        matched_pattern = (
+            None
+            if action == "delete_as_is"
+            else next((p for p in delete_patterns if p.fullmatch(name_lower)), None)
         )
-        if (
-            name_lower in delete_immediately
-            or name_lower in delete_service
-            or matched_pattern is not None
-        ):
+        if action in ("delete_as_is", "delete_service") or matched_pattern is not None:
             try:
-                path.unlink()
+                os.unlink(path)
                 stats.removed += 1
-                if matched_pattern is not None and name_lower not in delete_immediately:
+                if matched_pattern is not None:
                     logger.info(
-                        f"🗑 Удалён (pattern {matched_pattern.pattern!r}): {path.name}"
+                        f"🗑 Удалён (pattern {matched_pattern.pattern!r}): {name}"
                     )
                 else:
-                    logger.info(f"🗑 Удалён (as_is): {path.name}")
+                    logger.info(f"🗑 Удалён (as_is): {name}")
             except Exception as exc:
                 logger.err(f"[assets] Ошибка удаления {path}: {exc}")
             continue
 
         # Шаг 3: защищённые файлы не переименовываем (robots.txt, .htaccess, send_email.php)
-        if name_lower in exclude_from_rename:
+        if action == "exclude":
             continue
 
         # Шаг 4: переименование til→ai в имени файла
-        new_name = path.name
-        match = til_regex.search(path.stem)
+        new_name = name
+        stem, suffix = _split_name(name)
+        if til_literal is None or til_literal in stem.lower():
+            match = til_regex.search(stem)
+        else:
+            match = None
         if match:
-            new_name = _sanitize(til_regex.sub("ai", path.stem, count=1) + path.suffix)
-
-        if new_name != path.name:
-            new_path = path.with_name(new_name)
+            # Позиция уже найдена search() — склейка вместо повторного прохода sub()
+            new_name = _sanitize(stem[: match.start()] + "ai" + stem[match.end() :] + suffix)
+
+        if new_name != name:
+            new_path = os.path.join(os.path.dirname(path), new_name)
+            # Файл с новым именем уже есть — не перезаписываем его, как и
+            # _rename_with_case_handling: оба файла остаются, ссылки не трогаем
+            if os.path.lexists(new_path) and not _is_same_file(path, new_path):
+                logger.warn(
+                    "[assets] Пропуск переименования из-за конфликта: "
+                    f"{_project_relpath(path, root_prefix)} → {new_name}"
+                )
+                continue
             try:
-                old_rel = utils.relpath(path, project_root)
-                path = path.rename(new_path)
-                new_rel = utils.relpath(new_path, project_root)
-                rename_map[old_rel] = new_rel
+                old_rel = _project_relpath(path, root_prefix)
+                _replace_file(path, new_path)
+                text_cache.move(Path(path), Path(new_path))
+                path = new_path
+                name = new_name
+                new_rel = old_rel[: len(old_rel) - len(entry.name)] + new_name
+                pending_renames.append((old_rel, new_rel))
                 stats.renamed += 1
                 logger.info(f"🔄 Переименован: {old_rel} → {new_rel}")
-                name_lower = new_path.name.lower()
+                name_lower = new_name.lower()
             except Exception as exc:
-                logger.err(f"[assets] Ошибка переименования {path}: {exc}")
+                rename_errors += 1
+                if rename_errors <= _RENAME_ERROR_LOG_LIMIT:
+                    logger.err(f"[assets] Ошибка переименования {path}: {exc}")
                 continue
 
         # Шаг 5: если после переименования файл оказался Tilda-скриптом — удаляем
         if name_lower in delete_service:
             try:
-                path.unlink()
+                os.unlink(path)
                 stats.removed += 1
-                logger.info(f"🗑 Удалён скрипт: {path.name}")
+                logger.info(f"🗑 Удалён скрипт: {name}")
             except Exception as exc:
                 logger.err(f"[assets] Ошибка удаления {path}: {exc}")
+            continue
 
-    _ensure_1px_placeholder(project_root)
+        # 1px.png пережил шаги 4–5 под прежним именем (til_to_ai_filename из
+        # конфига мог его переименовать) — _ensure_1px_placeholder не нужен stat
+        if relative_path == _PLACEHOLDER_RELPATH and name == entry.name:
+            placeholder_present = True
 
-    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+    if rename_errors > _RENAME_ERROR_LOG_LIMIT:
+        logger.err(
+            f"[assets] Ошибок переименования: {rename_errors} "
+            f"(подробно показаны первые {_RENAME_ERROR_LOG_LIMIT})"
+        )
+
+    rename_map.update(pending_renames)
+
+    _ensure_1px_placeholder(project_root, known_present=placeholder_present)
+
+    _apply_case_normalization(
+        project_root, rename_map, stats, patterns_cfg, service_cfg, text_cache
+    )
 
     _copy_resource_files(resource_rules, project_root, rename_map)
 
@@ -119,12 +119,15 @@ def _reverse_path_for_real_cdn(path: str) -> str:
     return _REVERSE_TIL_AI_RE.sub("tilda", path)
 
 
+_CDN_NETLOC_RE = re.compile(r"\.(?:tilda|aida)cdn\.", re.IGNORECASE)
+
+
 def _extract_path_from_url(url: str) -> str | None:
     """Из https://static.tildacdn.com/lib/flags/flags7.png → lib/flags/flags7.png"""
     normalized_url = f"https:{url}" if url.startswith("//") else url
     split = urlsplit(normalized_url)
-    if not split.netloc.lower().startswith("static.") or not re.search(
-        r"\.(?:tilda|aida)cdn\.", split.netloc, re.IGNORECASE
+    if not split.netloc.lower().startswith("static.") or not _CDN_NETLOC_RE.search(
+        split.netloc
     ):
         return None
     return split.path.lstrip("/")
@@ -372,6 +375,9 @@ _LINK_TAG_RE = re.compile(
     r"<link\b[^>]*href=['\"][^'\"]*(?:tilda|aida)cdn[^'\"]*['\"][^>]*/?>",
     re.IGNORECASE,
 )
+_RESOURCE_HINT_REL_RE = re.compile(
+    r"rel=['\"]?(?:dns-prefetch|preconnect)['\"]?", re.IGNORECASE
+)
 
 
 @dataclass
@@ -416,7 +422,7 @@ def cleanup_unresolved_cdn_references(project_root: Path) -> CleanupResult:
         def _link_replacer(match: re.Match[str]) -> str:
             tag = match.group(0)
             # dns-prefetch и preconnect не блокируют рендеринг, оставляем
-            if re.search(r"rel=['\"]?(?:dns-prefetch|preconnect)['\"]?", tag, re.IGNORECASE):
+            if _RESOURCE_HINT_REL_RE.search(tag):
                 return tag
             return ""
 
@@ -27,7 +27,7 @@ from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from core import logger, utils
 from core.config_loader import ConfigLoader
-from core.downloader import download_to_project
+from core.downloader import download_to_project, prepare_download_rules
 from core.htaccess import HtaccessResult, collect_routes
 
 __all__ = [
@@ -76,7 +76,7 @@ class ZeroFormSmokeResult:
 
 
 def _compile_link_patterns(patterns: Iterable[str]) -> list[re.Pattern[str]]:
-    """Компилирует паттерны из config.yaml для повторного использования."""
+    """Компилирует паттерны из config.yaml один раз на весь обход файлов."""
     result = []
     for pattern in patterns:
         try:
@@ -97,6 +97,18 @@ def _iter_links(text: str, compiled: Iterable[re.Pattern[str]]) -> Iterable[str]
 
 def _strip_cache_busting_param(link: str) -> str:
     """Удаляет ?t=... (cache-busting параметр Tilda) и fragment из URL."""
+    # Обычная внутренняя ссылка (css/a.css, /page) без query, fragment и схемы
+    # проходит urlsplit/urlunsplit без изменений — разбор пропускаем.
+    # "//", пробелы и управляющие символы urlsplit нормализует — для них полный путь.
+    if (
+        "?" not in link
+        and "#" not in link
+        and ":" not in link
+        and not link.startswith("//")
+        and link.isprintable()
+        and not link[:1].isspace()
+    ):
+        return link
     split = urlsplit(link)
     filtered_params = [
         (key, value)
@@ -157,8 +169,8 @@ def _get_effective_base_directory(file_path: Path, project_root: Path) -> Path:
 
 
 def _relative_candidates(
-    file_path: Path,
-    base_directory: Path,
+    physical_directory: str,
+    base_directory: str,
     link_target: str,
 ) -> list[Path]:
     """Return possible filesystem targets for a relative link.
@@ -166,9 +178,12 @@ def _relative_candidates(
     Body fragments can be interpreted in two contexts:
     - as injected HTML inside the real page, where links resolve from page root;
     - as physical files under files/, where links like ../page.html are valid.
+
+    Both directories are resolved once per file by the caller; the link is
+    joined lexically (normpath) instead of a resolve() syscall chain per link.
     """
-    candidates = [(base_directory / link_target).resolve()]
-    physical_candidate = (file_path.parent / link_target).resolve()
+    candidates = [Path(os.path.normpath(os.path.join(base_directory, link_target)))]
+    physical_candidate = Path(os.path.normpath(os.path.join(physical_directory, link_target)))
     if physical_candidate not in candidates:
         candidates.append(physical_candidate)
     return candidates
@@ -188,24 +203,37 @@ def check_links(project_root: Path, loader: ConfigLoader) -> LinkCheckerResult:
     htaccess_result = collect_routes(project_root, loader)
     result = LinkCheckerResult(htaccess_result=htaccess_result)
 
+    # Одни и те же css/js/картинки подключены на сотнях страниц — exists()
+    # для каждого пути выполняется один раз за проверку
+    exists_cache: dict[Path, bool] = {}
+
+    def _exists(candidate: Path) -> bool:
+        cached = exists_cache.get(candidate)
+        if cached is None:
+            cached = exists_cache[candidate] = candidate.exists()
+        return cached
+
     for file_path in utils.list_files_recursive(project_root, extensions=(".html", ".htm")):
         try:
             text = utils.safe_read(file_path)
         except Exception:
             continue
-        base_directory = _get_effective_base_directory(file_path, project_root)
+        base_directory = str(_get_effective_base_directory(file_path, project_root).resolve())
+        physical_directory = str(file_path.parent.resolve())
+        # Одна и та же битая ссылка на странице логируется один раз (счётчик — по всем)
+        reported_links: set[str] = set()
+        file_rel: str | None = None  # считается при первой битой ссылке файла
 
         for link in _iter_links(text, compiled_link_patterns):
             normalized_link = _strip_cache_busting_param(link)
             if not normalized_link:
                 continue
 
-            link_parts = urlsplit(normalized_link)
-            link_path = link_parts.path
-
-            if any(normalized_link.startswith(prefix) for prefix in ignore_prefixes):
+            if normalized_link.startswith(ignore_prefixes):
                 continue
 
+            link_path = urlsplit(normalized_link).path
+
             if link.startswith("/"):
                 route_info = htaccess_result.get_route_info(link_path or normalized_link)
                 if route_info and route_info.exists and route_info.path is not None:
@@ -215,17 +243,19 @@ def check_links(project_root: Path, loader: ConfigLoader) -> LinkCheckerResult:
                 candidates = [candidate]
             else:
                 candidates = _relative_candidates(
-                    file_path,
+                    physical_directory,
                     base_directory,
                     link_path or normalized_link,
                 )
 
             result.checked += 1
-            if not any(candidate.exists() for candidate in candidates):
+            if not any(_exists(candidate) for candidate in candidates):
                 result.broken += 1
-                logger.warn(
-                    f"[checker] Битая ссылка в {utils.relpath(file_path, project_root)}: {normalized_link}"
-                )
+                if normalized_link not in reported_links:
+                    reported_links.add(normalized_link)
+                    if file_rel is None:
+                        file_rel = utils.relpath(file_path, project_root)
+                    logger.warn(f"[checker] Битая ссылка в {file_rel}: {normalized_link}")
 
     logger.info(
         f"🔍 Проверка ссылок завершена. Проверено: {result.checked}, битых: {result.broken}"
@@ -237,18 +267,48 @@ def _is_absolute_url(link: str) -> bool:
     return link.startswith(("http://", "https://", "//"))
 
 
-def _apply_replace_rules(link: str, rules: list) -> str:
-    """Применяет replace_rules к ссылке (ReplaceRule объекты из config.yaml)."""
-    result = link
+def _compile_replace_rules(rules: list) -> list[tuple[re.Pattern[str], str]]:
+    """Компилирует replace_rules (ReplaceRule объекты из config.yaml) один раз на проверку.
+
+    Некорректные паттерны пропускаются молча — как и раньше при re.sub на каждой ссылке.
+    """
+    compiled: list[tuple[re.Pattern[str], str]] = []
     for rule in rules:
+        if not (hasattr(rule, "pattern") and rule.pattern):
+            continue
         try:
-            if hasattr(rule, "pattern") and rule.pattern:
-                result = re.sub(str(rule.pattern), str(getattr(rule, "replacement", "")), result)
+            compiled.append(
+                (re.compile(str(rule.pattern)), str(getattr(rule, "replacement", "")))
+            )
+        except re.error:
+            pass
+    return compiled
+
+
+def _apply_replace_rules(link: str, rules: list[tuple[re.Pattern[str], str]]) -> str:
+    """Применяет скомпилированные replace_rules к ссылке."""
+    result = link
+    for pattern, replacement in rules:
+        try:
+            result = pattern.sub(replacement, result)
         except re.error:
             pass
     return result
 
 
+def _replace_literals(text: str, replacements: dict[str, str]) -> str:
+    """Заменяет все вхождения ключей replacements одним проходом по тексту.
+
+    Длинные ключи идут в альтернативе первыми — ссылка, которая является
+    префиксом другой, не портит более длинную; замены не применяются
+    повторно к уже подставленному тексту.
+    """
+    alternation = "|".join(
+        re.escape(key) for key in sorted(replacements, key=len, reverse=True)
+    )
+    return re.sub(alternation, lambda match: replacements[match.group(0)], text)
+
+
 def check_tilda_remnants(project_root: Path, loader: ConfigLoader) -> TildaRemnantsResult:
     """Находит и исправляет оставшиеся ссылки со словом 'tilda'.
 
@@ -261,26 +321,36 @@ def check_tilda_remnants(project_root: Path, loader: ConfigLoader) -> TildaRemna
     patterns_cfg = loader.patterns()
     service_cfg = loader.service_files()
     compiled_link_patterns = _compile_link_patterns(patterns_cfg.links)
-    replace_rules = patterns_cfg.replace_rules
-    download_rules = [
+    replace_rules = _compile_replace_rules(patterns_cfg.replace_rules)
+    download_rules = prepare_download_rules([
         {"folder": r.folder, "extensions": list(r.extensions)}
         for r in service_cfg.remote_assets.rules
-    ]
+    ])
     text_extensions = tuple(patterns_cfg.text_extensions) or (".html", ".htm", ".css", ".js")
 
     result = TildaRemnantsResult()
 
     for file_path in utils.list_files_recursive(project_root, extensions=text_extensions):
         try:
-            text = utils.safe_read(file_path)
+            data = file_path.read_bytes()
+        except Exception:
+            continue
+        # Нужны только ссылки с "tilda": если подстроки нет во всём файле
+        # (в любом регистре), файл не декодируется и не сканируется
+        if b"tilda" not in data.lower():
+            continue
+        try:
+            text = utils.decode_text(data)
         except Exception:
             continue
 
-        original = text
+        file_rel = utils.relpath(file_path, project_root)
         file_hits = 0
+        # link → исправленная ссылка; применяется к тексту одним проходом после сканирования
+        replacements: dict[str, str] = {}
 
-        for link in _iter_links(original, compiled_link_patterns):
-            if "tilda" not in link.lower():
+        for link in _iter_links(text, compiled_link_patterns):
+            if "tilda" not in link.lower() or link in replacements:
                 continue
 
             if _is_absolute_url(link):
@@ -289,54 +359,57 @@ def check_tilda_remnants(project_root: Path, loader: ConfigLoader) -> TildaRemna
                 if downloaded:
                     dest_path, _ = downloaded
                     rel = os.path.relpath(dest_path, file_path.parent).replace("\\", "/")
-                    text = text.replace(link, rel)
+                    replacements[link] = rel
                     logger.info(
-                        f"[tilda-remnants] Локализован: {link} → {rel} "
-                        f"в {utils.relpath(file_path, project_root)}"
+                        f"[tilda-remnants] Локализован: {link} → {rel} в {file_rel}"
                     )
                 else:
                     fixed = _apply_replace_rules(link, replace_rules)
                     if fixed != link:
-                        text = text.replace(link, fixed)
+                        replacements[link] = fixed
                         logger.warn(
                             f"[tilda-remnants] Не скачан, применены правила замены: "
-                            f"{link} → {fixed} в {utils.relpath(file_path, project_root)}"
+                            f"{link} → {fixed} в {file_rel}"
                         )
                     else:
                         file_hits += 1
                         logger.warn(
-                            f"[tilda-remnants] Не удалось исправить: {link} "
-                            f"в {utils.relpath(file_path, project_root)}"
+                            f"[tilda-remnants] Не удалось исправить: {link} в {file_rel}"
                         )
             else:
                 # Локальный путь — применяем replace_rules
                 fixed = _apply_replace_rules(link, replace_rules)
                 if fixed != link:
-                    text = text.replace(link, fixed)
+                    replacements[link] = fixed
                     logger.info(
-                        f"[tilda-remnants] Исправлен локальный путь: {link} → {fixed} "
-                        f"в {utils.relpath(file_path, project_root)}"
+                        f"[tilda-remnants] Исправлен локальный путь: {link} → {fixed} в {file_rel}"
                     )
                 else:
                     file_hits += 1
                     logger.warn(
-                        f"[tilda-remnants] Не удалось исправить: {link} "
-                        f"в {utils.relpath(file_path, project_root)}"
+                        f"[tilda-remnants] Не удалось исправить: {link} в {file_rel}"
                     )
 
-        if text != original:
-            utils.safe_write(file_path, text)
+        if replacements:
+            utils.safe_write(file_path, _replace_literals(text, replacements))
 
         if file_hits:
             result.files_with_remnants += 1
             result.total_occurrences += file_hits
 
     # Сканируем имена файлов — assets мог пропустить файлы с 'tilda' в имени
-    for file_path in sorted(project_root.rglob("*")):
-        if file_path.is_file() and "tilda" in file_path.name.lower():
-            rel = utils.relpath(file_path, project_root)
-            result.tilda_filenames.append(rel)
-            logger.warn(f"[tilda-remnants] Файл с именем tilda: {rel}")
+    # Фильтр по имени DirEntry — до создания Path; порядок как у sorted(rglob("*"))
+    tilda_named = sorted(
+        (
+            relative
+            for entry, relative in utils.iter_files(project_root)
+            if "tilda" in entry.name.lower()
+        ),
+        key=lambda relative: relative.split("/"),
+    )
+    for rel in tilda_named:
+        result.tilda_filenames.append(rel)
+        logger.warn(f"[tilda-remnants] Файл с именем tilda: {rel}")
 
     if result.total_occurrences:
         logger.warn(
@@ -10,6 +10,8 @@
 Жизненный цикл:
   - ConfigLoader создаётся в ProjectContext.from_project_root()
   - Конфиг загружается лениво при первом обращении и кэшируется
+  - Разобранный AppConfig переиспользуется другими ConfigLoader того же
+    процесса, пока config.yaml не изменился (mtime/размер)
   - При ошибке загрузки возвращается AppConfig() с дефолтами
 """
 from __future__ import annotations
@@ -34,6 +36,19 @@ from core.schemas import (
 
 _DEFAULT_BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Разобранные конфиги на уровне процесса. ProjectContext.from_project_root()
+# создаёт новый ConfigLoader на каждый проект, а результат разбора YAML и
+# валидации зависит только от содержимого файла. Ключ —
+# (resolved path, st_mtime_ns, st_size): правка config.yaml даёт новый ключ.
+# Значение — (AppConfig, ошибки regex): ошибки логируются при каждой загрузке.
+_PARSED_CACHE: Dict[tuple[str, int, int], tuple[AppConfig, tuple[str, ...]]] = {}
+_PARSED_CACHE_MAX = 8
+
+
+def _clear_parsed_cache() -> None:
+    """Сбрасывает кэш разобранных конфигов (для тестов, подменяющих yaml)."""
+    _PARSED_CACHE.clear()
+
 
 def _normalize_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Нормализует сырой YAML перед передачей в Pydantic.
@@ -101,12 +116,22 @@ class ConfigLoader:
 
         path = self.config_path
         try:
-            data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
-            if not isinstance(data, dict):
-                raise ValueError("config.yaml должен содержать словарь")
-            config = _validate_config(data)
+            stat = path.stat()
+            key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+            cached = _PARSED_CACHE.get(key)
+            if cached is not None:
+                config, errors = cached
+            else:
+                data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+                if not isinstance(data, dict):
+                    raise ValueError("config.yaml должен содержать словарь")
+                config = _validate_config(data)
+                errors = tuple(validate_regex_patterns(config))
+                if len(_PARSED_CACHE) >= _PARSED_CACHE_MAX:
+                    _PARSED_CACHE.clear()
+                _PARSED_CACHE[key] = (config, errors)
             # Проверяем все regex-паттерны сразу — невалидные логируются как warnings
-            for error in validate_regex_patterns(config):
+            for error in errors:
                 logger.warn(f"[config_loader] {error}")
         except FileNotFoundError:
             logger.err(f"[config_loader] Не найден файл конфигурации: {path}")
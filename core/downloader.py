@@ -7,17 +7,29 @@ from __future__ import annotations
 
 import contextlib
 import gzip
+import hashlib
+import http.client
+import os
+import shutil
 import ssl
+import threading
 import urllib.error
 import urllib.parse
 import urllib.request
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+from uuid import uuid4
 
 from core import logger
 
 __all__ = [
+    "DownloadRules",
+    "DownloadWriteError",
     "fetch_bytes",
     "fetch_text",
+    "fetch_to_file",
+    "prepare_download_rules",
     "resolve_download_folder",
     "download_to_project",
 ]
@@ -28,21 +40,186 @@ _BROWSER_UA = (
     "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 )
 
-_SSL_FALLBACK_CONTEXT: ssl.SSLContext | None = None
+# Размер блока при потоковой записи ответа на диск
+_STREAM_BUFSIZE = 1024 * 1024
+
+# Сколько простаивающих HTTPS-соединений держать на один хост
+# (по числу потоков скачивания в assets._DOWNLOAD_WORKERS)
+_POOL_MAXSIZE_PER_HOST = 16
+
+_T = TypeVar("_T")
+
+@dataclass(frozen=True)
+class DownloadRules:
+    """Правила скачивания после prepare_download_rules().
+
+    Отдельный тип, а не голый tuple: кортеж сырых dict из конфига нельзя
+    спутать с уже подготовленными правилами.
+    """
+    # (folder, расширения); None вместо множества — правило без фильтра по расширению
+    rules: tuple[tuple[str, frozenset[str] | None], ...]
+
+
+class _PooledResponse(http.client.HTTPResponse):
+    """HTTP-ответ, который при закрытии возвращает соединение в пул."""
+
+    _release: Callable[[bool], None] | None = None
+
+    def close(self) -> None:
+        # fp уже None — тело дочитано до конца, соединение можно переиспользовать
+        drained = self.fp is None
+        try:
+            super().close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release(drained)
+
+
+class _PooledHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection, которое переживает AbstractHTTPHandler.do_open().
+
+    do_open() ставит "Connection: close" и после getresponse() закрывает
+    h.sock. Здесь заголовок снимается, а сокет на время чтения ответа убирается
+    из h.sock и возвращается обратно, когда ответ дочитан (_PooledResponse).
+    """
+
+    response_class = _PooledResponse
+
+    def __init__(self, *args, pool_release: Callable[..., None], **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._pool_release = pool_release
+        self._parked_sock = None
+
+    def set_tunnel(self, host, port=None, headers=None) -> None:
+        # Переиспользуемое соединение уже туннелировано к тому же хосту (ключ пула)
+        if self.sock is None:
+            super().set_tunnel(host, port, headers)
+
+    def request(self, method, url, body=None, headers={}, *, encode_chunked=False) -> None:
+        headers = {name: value for name, value in headers.items() if name.lower() != "connection"}
+        super().request(method, url, body, headers, encode_chunked=encode_chunked)
+
+    def getresponse(self) -> http.client.HTTPResponse:
+        response = super().getresponse()
+        # will_close — http.client уже закрыл соединение, в пул оно не вернётся
+        self._parked_sock, self.sock = self.sock, None
+        response._release = self._release_response  # type: ignore[attr-defined]
+        return response
+
+    def _release_response(self, drained: bool) -> None:
+        sock, self._parked_sock = self._parked_sock, None
+        if drained and sock is not None:
+            self.sock = sock
+            self._pool_release(self, True)
+            return
+        if sock is not None:
+            sock.close()
+        self._pool_release(self, False)
+
+    def close(self) -> None:
+        sock, self._parked_sock = self._parked_sock, None
+        if sock is not None:
+            sock.close()
+        super().close()
+
+
+def _is_stale_connection_error(exc: BaseException) -> bool:
+    """Ошибка переиспользованного соединения, которое сервер закрыл в простое."""
+    if isinstance(exc, urllib.error.URLError) and isinstance(exc.reason, BaseException):
+        exc = exc.reason
+    if isinstance(exc, TimeoutError):
+        return False
+    return isinstance(exc, (OSError, http.client.BadStatusLine))
+
+
+class _KeepAliveHTTPSHandler(urllib.request.HTTPSHandler):
+    """HTTPSHandler с пулом keep-alive соединений по хосту.
+
+    Стандартный do_open() ставит "Connection: close" — каждый URL платит
+    за новый TCP+TLS handshake, хотя почти все ассеты идут с одного Tilda CDN.
+    Запрос по-прежнему выполняет do_open(); handler лишь подставляет фабрику
+    соединений, которая берёт соединение из пула. Соединение после полностью
+    прочитанного ответа возвращается в пул (из любого потока). Если сервер
+    закрыл соединение, пока оно простаивало, запрос повторяется на новом.
+    """
+
+    def __init__(self, context: ssl.SSLContext) -> None:
+        super().__init__(context=context)
+        self._idle: dict[tuple[str, str], list[_PooledHTTPSConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _checkin(
+        self, key: tuple[str, str], conn: _PooledHTTPSConnection, reusable: bool
+    ) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < _POOL_MAXSIZE_PER_HOST:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def https_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        # req.host — адрес соединения (прокси при CONNECT), netloc — целевой хост
+        key = (req.host, urllib.parse.urlsplit(req.full_url).netloc)
+
+        while True:
+            reused = False
+
+            def _connection(host: str, **kwargs) -> _PooledHTTPSConnection:
+                nonlocal reused
+                with self._lock:
+                    idle = self._idle.get(key)
+                    conn = idle.pop() if idle else None
+                if conn is not None:
+                    reused = True
+                    conn.timeout = kwargs.get("timeout", conn.timeout)
+                    if conn.sock is not None:
+                        conn.sock.settimeout(conn.timeout)
+                    return conn
+                return _PooledHTTPSConnection(
+                    host,
+                    pool_release=lambda c, ok: self._checkin(key, c, ok),
+                    **kwargs,
+                )
+
+            try:
+                return self.do_open(_connection, req, context=self._context)
+            except Exception as exc:
+                if reused and _is_stale_connection_error(exc):
+                    continue
+                raise
+
+
+# Opener'ы создаются при импорте: в пути скачивания (в т.ч. из нескольких
+# потоков) нет ленивой инициализации и гонки, а пулы соединений общие для
+# всех вызовов. Второй — для повтора без проверки сертификата.
+_OPENER = urllib.request.build_opener(_KeepAliveHTTPSHandler(ssl.create_default_context()))
+
+_SSL_FALLBACK_CONTEXT = ssl.create_default_context()
+_SSL_FALLBACK_CONTEXT.check_hostname = False
+_SSL_FALLBACK_CONTEXT.verify_mode = ssl.CERT_NONE  # noqa: S501 - намеренный fallback для хостов с битым SSL
+_INSECURE_OPENER = urllib.request.build_opener(_KeepAliveHTTPSHandler(_SSL_FALLBACK_CONTEXT))
 
 # Хосты у которых SSL уже сломан — сразу используем unverified context.
 # Без этого каждый URL делает SSL handshake → fail → retry без проверки = двойной timeout.
 _SSL_BROKEN_HOSTS: set[str] = set()
 
 
-def _get_unverified_context() -> ssl.SSLContext:
-    global _SSL_FALLBACK_CONTEXT
-    if _SSL_FALLBACK_CONTEXT is None:
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        _SSL_FALLBACK_CONTEXT = ctx
-    return _SSL_FALLBACK_CONTEXT
+class DownloadWriteError(OSError):
+    """Ошибка записи скачанного файла на диск — не ошибка сети."""
+
+
+@contextlib.contextmanager
+def _as_write_error():
+    """Переводит OSError локальной файловой операции в DownloadWriteError."""
+    try:
+        yield
+    except DownloadWriteError:
+        raise
+    except OSError as exc:
+        raise DownloadWriteError(*exc.args) from exc
 
 
 def _normalize_url(url: str) -> str:
@@ -67,13 +244,18 @@ def _decode_response(resp) -> bytes:
     return raw
 
 
-def fetch_bytes(url: str, *, user_agent: str = _DEFAULT_UA, timeout: int = 20) -> tuple[bytes, bool]:
-    """Download *url* and return ``(data, ssl_bypassed)``.
+def _open_with_ssl_fallback(
+    url: str,
+    consume: Callable[..., _T],
+    *,
+    user_agent: str,
+    timeout: int,
+) -> tuple[_T, bool]:
+    """Открывает *url* и передаёт ответ в *consume*. Возвращает ``(result, ssl_bypassed)``.
 
     On SSL error retries once with certificate verification disabled.
     Запоминает хосты с битым SSL — следующие URL на тот же хост сразу идут
     без верификации (избегаем двойной timeout на каждый URL).
-    Automatically decompresses gzip-encoded responses.
     """
     normalized = _normalize_url(url)
     request = urllib.request.Request(
@@ -83,16 +265,17 @@ def fetch_bytes(url: str, *, user_agent: str = _DEFAULT_UA, timeout: int = 20) -
 
     host = urllib.parse.urlsplit(normalized).hostname or ""
 
+    def _open(insecure: bool) -> _T:
+        open_url = _INSECURE_OPENER.open if insecure else _OPENER.open
+        with contextlib.closing(open_url(request, timeout=timeout)) as resp:  # type: ignore[arg-type]
+            return consume(resp)
+
     # Если для этого хоста SSL уже ломался — сразу без проверки
     if host in _SSL_BROKEN_HOSTS:
-        with contextlib.closing(
-            urllib.request.urlopen(request, timeout=timeout, context=_get_unverified_context())  # type: ignore[arg-type]
-        ) as resp:
-            return _decode_response(resp), True
+        return _open(insecure=True), True
 
     try:
-        with contextlib.closing(urllib.request.urlopen(request, timeout=timeout)) as resp:  # type: ignore[arg-type]
-            return _decode_response(resp), False
+        return _open(insecure=False), False
     except urllib.error.URLError as exc:
         if not isinstance(getattr(exc, "reason", None), ssl.SSLError):
             raise
@@ -101,10 +284,132 @@ def fetch_bytes(url: str, *, user_agent: str = _DEFAULT_UA, timeout: int = 20) -
 
     logger.warn(f"[downloader] SSL-проверка не удалась для {host}, повтор без проверки (для всех URL этого хоста)")
     _SSL_BROKEN_HOSTS.add(host)
-    with contextlib.closing(
-        urllib.request.urlopen(request, timeout=timeout, context=_get_unverified_context())  # type: ignore[arg-type]
-    ) as resp:
-        return _decode_response(resp), True
+    return _open(insecure=True), True
+
+
+def fetch_bytes(url: str, *, user_agent: str = _DEFAULT_UA, timeout: int = 20) -> tuple[bytes, bool]:
+    """Download *url* and return ``(data, ssl_bypassed)``.
+
+    SSL fallback — см. _open_with_ssl_fallback().
+    Automatically decompresses gzip-encoded responses.
+    """
+    return _open_with_ssl_fallback(
+        url, _decode_response, user_agent=user_agent, timeout=timeout
+    )
+
+
+def _cache_pointer(cache_dir: Path, url: str) -> Path:
+    """Файл с sha256 содержимого для *url*. Ключ — URL без схемы (http/https/// — одно)."""
+    key = _normalize_url(url).split(":", 1)[-1]
+    return cache_dir / "urls" / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_STREAM_BUFSIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_atomically(target: Path, write: Callable[[Path], None]) -> None:
+    """write(temp) во временный файл рядом с target, затем os.replace(temp, target)."""
+    temp_path = target.with_name(f".{target.name}.{uuid4().hex}.part")
+    try:
+        write(temp_path)
+        os.replace(temp_path, target)
+    finally:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+
+
+def _restore_from_cache(cache_dir: Path, url: str, destination: Path) -> bool:
+    """Копирует ранее скачанный *url* из кэша в *destination*. False — в кэше нет."""
+    try:
+        content_hash = _cache_pointer(cache_dir, url).read_text(encoding="ascii").strip()
+        blob = cache_dir / "blobs" / content_hash
+        # Копия, не hardlink: следующие шаги переписывают CSS/JS на месте
+        _replace_atomically(destination, lambda temp: shutil.copyfile(blob, temp))
+    except OSError:
+        return False
+    return True
+
+
+def _store_in_cache(cache_dir: Path, url: str, source: Path) -> None:
+    """Кладёт скачанный файл в кэш: blobs/<sha256 содержимого> + urls/<sha256 URL>.
+
+    Одинаковое содержимое по разным URL хранится один раз. Ошибка кэша
+    не ломает скачивание — только предупреждение в логе.
+    """
+    try:
+        content_hash = _file_sha256(source)
+        blob = cache_dir / "blobs" / content_hash
+        pointer = _cache_pointer(cache_dir, url)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        pointer.parent.mkdir(parents=True, exist_ok=True)
+        if not blob.exists():
+            _replace_atomically(blob, lambda temp: shutil.copyfile(source, temp))
+        _replace_atomically(pointer, lambda temp: temp.write_text(content_hash, encoding="ascii"))
+    except OSError as exc:
+        logger.warn(f"[downloader] Не удалось сохранить {url} в кэш: {exc}")
+
+
+def fetch_to_file(
+    url: str,
+    destination: Path,
+    *,
+    user_agent: str = _DEFAULT_UA,
+    timeout: int = 20,
+    cache_dir: Path | None = None,
+) -> bool:
+    """Download *url* straight into *destination* and return ``ssl_bypassed``.
+
+    Тело ответа пишется блоками во временный файл рядом с destination,
+    затем атомарно переименовывается через os.replace() — без промежуточного
+    bytes-объекта с полным содержимым. gzip-ответы распаковываются в памяти
+    через _decode_response(), чтобы сохранить запасной вариант с сырыми данными.
+
+    cache_dir — кэш на диске между запусками: если *url* уже скачивался,
+    файл копируется из кэша без обращения к сети.
+
+    Ошибки открытия, записи и переименования файла поднимаются как
+    DownloadWriteError; обрыв соединения посреди тела (ConnectionResetError,
+    ssl.SSLError, http.client.IncompleteRead) — как есть.
+    """
+    destination = Path(destination)
+    if cache_dir is not None and _restore_from_cache(cache_dir, url, destination):
+        return False
+    temp_path = destination.with_name(f".{destination.name}.{uuid4().hex}.part")
+
+    def _consume(resp) -> None:
+        # Вместо copyfileobj(): чтение ответа (сеть) и запись (диск)
+        # должны давать разные ошибки
+        with _as_write_error():
+            handle = open(temp_path, "wb")
+        try:
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                chunks = iter((_decode_response(resp),))
+            else:
+                chunks = iter(lambda: resp.read(_STREAM_BUFSIZE), b"")
+            for chunk in chunks:
+                with _as_write_error():
+                    handle.write(chunk)
+        finally:
+            with _as_write_error():
+                handle.close()
+
+    try:
+        _, ssl_bypassed = _open_with_ssl_fallback(
+            url, _consume, user_agent=user_agent, timeout=timeout
+        )
+        with _as_write_error():
+            os.replace(temp_path, destination)
+    finally:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+    if cache_dir is not None:
+        _store_in_cache(cache_dir, url, destination)
+    return ssl_bypassed
 
 
 def fetch_text(url: str, *, user_agent: str = _BROWSER_UA, timeout: int = 20) -> str:
@@ -113,11 +418,37 @@ def fetch_text(url: str, *, user_agent: str = _BROWSER_UA, timeout: int = 20) ->
     return data.decode("utf-8", errors="replace")
 
 
-def resolve_download_folder(url: str, rules: list[dict]) -> tuple[str, str] | None:
+def prepare_download_rules(rules: Iterable[dict]) -> DownloadRules:
+    """Canonicalise remote-asset *rules* once for repeated resolve calls.
+
+    Папка очищается от пробелов и слешей, расширения приводятся к lowercase
+    frozenset; правила без папки отбрасываются. Результат можно передавать
+    в resolve_download_folder() / download_to_project() вместо списка dict.
+    """
+    prepared: list[tuple[str, frozenset[str] | None]] = []
+    for rule in rules:
+        folder = str(rule.get("folder", "")).strip().strip("/")
+        if not folder:
+            continue
+        extensions = rule.get("extensions")
+        exts = (
+            frozenset(str(e).lower() for e in extensions if isinstance(e, str))
+            if extensions
+            else None
+        )
+        prepared.append((folder, exts))
+    return DownloadRules(tuple(prepared))
+
+
+def resolve_download_folder(
+    url: str, rules: Iterable[dict] | DownloadRules
+) -> tuple[str, str] | None:
     """Return ``(folder, filename)`` for *url* based on extension rules.
 
+    *rules* — raw config dicts or the result of :func:`prepare_download_rules`.
     Returns ``None`` if no rule matches.
     """
+    prepared = rules if isinstance(rules, DownloadRules) else prepare_download_rules(rules)
     parsed = urllib.parse.urlsplit(_normalize_url(url))
     if parsed.scheme not in {"http", "https"}:
         return None
@@ -125,15 +456,9 @@ def resolve_download_folder(url: str, rules: list[dict]) -> tuple[str, str] | No
     if not filename:
         return None
     suffix = Path(filename).suffix.lower()
-    for rule in rules:
-        folder = str(rule.get("folder", "")).strip().strip("/")
-        if not folder:
+    for folder, exts in prepared.rules:
+        if exts is not None and suffix not in exts:
             continue
-        extensions = rule.get("extensions")
-        if extensions:
-            exts = {str(e).lower() for e in extensions if isinstance(e, str)}
-            if suffix not in exts:
-                continue
         return folder, filename
     return None
 
@@ -141,7 +466,7 @@ def resolve_download_folder(url: str, rules: list[dict]) -> tuple[str, str] | No
 def download_to_project(
     url: str,
     project_root: Path,
-    rules: list[dict],
+    rules: Iterable[dict] | DownloadRules,
 ) -> tuple[Path, bool] | None:
     """Download *url* into the project folder determined by *rules*.
 
@@ -157,8 +482,7 @@ def download_to_project(
         return destination, False
     destination.parent.mkdir(parents=True, exist_ok=True)
     try:
-        data, ssl_bypassed = fetch_bytes(url)
-        destination.write_bytes(data)
+        ssl_bypassed = fetch_to_file(url, destination)
         logger.info(f"🌐 Загружен ресурс: {url} → {folder}/{filename}")
         return destination, ssl_bypassed
     except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as exc:
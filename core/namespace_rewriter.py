@@ -35,6 +35,9 @@ _WORD_REPLACEMENTS: tuple[tuple[re.Pattern[str], str], ...] = (
     (re.compile(r"\btil(?!eColor\b|eImage\b)"), "ai"),
 )
 
+_WINDOW_TILDA_RE = re.compile(r"\bwindow\.Tilda\b")
+_TILDA_NAMESPACE_RE = re.compile(r"\bTilda(?=\.)")
+
 _CLASS_PREFIX_RE = re.compile(r"\bt-")
 _FUNCTION_IDENTIFIER_RE = re.compile(r"\bt(?=(?:\d+_|_))[A-Za-z0-9_$]*")
 
@@ -51,6 +54,11 @@ _CRITICAL_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
     ("t_* runtime function", re.compile(r"\bt(?=(?:\d+_|_))[A-Za-z0-9_$]*\b")),
 )
 
+# Остатки старого namespace в именах путей: один проход вместо трёх search.
+# Длина совпадения задаёт метку; для имени берётся самая специфичная.
+_FILENAME_LEFTOVER_RE = re.compile(r"\btil(?:d(?:a)?)?", re.IGNORECASE)
+_FILENAME_LEFTOVER_LABELS = {5: "filename tilda", 4: "filename tild", 3: "filename til"}
+
 _WARNING_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
     ("external tilda URL", re.compile(r"(?:https?:)?//[^\s'\"<>]*tilda[^\s'\"<>]*", re.IGNORECASE)),
 )
@@ -127,9 +135,9 @@ def _rewrite_js_text(text: str) -> tuple[str, int]:
 
     text, count = _apply_function_replacements(text)
     total += count
-    text, count = re.subn(r"\bwindow\.Tilda\b", "window.Aida", text)
+    text, count = _WINDOW_TILDA_RE.subn("window.Aida", text)
     total += count
-    text, count = re.subn(r"\bTilda(?=\.)", "Aida", text)
+    text, count = _TILDA_NAMESPACE_RE.subn("Aida", text)
     total += count
     return text, total
 
@@ -205,19 +213,19 @@ def _rename_namespace_paths(project_root: Path) -> tuple[dict[str, str], int]:
     rename_map: dict[str, str] = {}
     renamed = 0
 
-    paths = sorted(
-        [path for path in project_root.rglob("*") if path != project_root],
-        key=lambda item: len(item.parts),
+    # Один обход os.scandir: файлы и папки вместе, глубокие пути первыми —
+    # переименование папки не ломает ещё не обработанные пути внутри неё
+    entries = sorted(
+        utils.iter_files(project_root, include_dirs=True),
+        key=lambda item: item[1].count("/"),
         reverse=True,
     )
-    for path in paths:
-        if not path.exists():
-            continue
-        new_name = _rewrite_path_name(path.name)
-        if new_name == path.name:
+    for entry, old_rel in entries:
+        new_name = _rewrite_path_name(entry.name)
+        if new_name == entry.name:
             continue
+        path = Path(entry.path)
         destination = path.with_name(new_name)
-        old_rel = utils.relpath(path, project_root)
         if destination.exists():
             logger.warn(
                 f"[namespace_rewrite] Пропуск переименования из-за конфликта: {old_rel}"
@@ -229,53 +237,87 @@ def _rename_namespace_paths(project_root: Path) -> tuple[dict[str, str], int]:
             logger.warn(f"[namespace_rewrite] Не удалось переименовать {old_rel}: {exc}")
             continue
 
-        new_rel = utils.relpath(destination, project_root)
+        new_rel = old_rel[: len(old_rel) - len(entry.name)] + new_name
         rename_map[old_rel] = new_rel
-        rename_map[path.name] = destination.name
+        rename_map[entry.name] = new_name
         renamed += 1
         logger.info(f"[namespace_rewrite] Переименован: {old_rel} → {new_rel}")
 
     return rename_map, renamed
 
 
-def _apply_rename_map(text: str, rename_map: dict[str, str]) -> tuple[str, int]:
+def _ordered_renames(rename_map: dict[str, str]) -> list[tuple[str, str]]:
+    """Пары замены длинные первыми — порядок считается один раз на весь проект."""
+    return [
+        (old, new)
+        for old, new in sorted(rename_map.items(), key=lambda item: len(item[0]), reverse=True)
+        if old and old != new
+    ]
+
+
+def _apply_rename_map(text: str, renames: list[tuple[str, str]]) -> tuple[str, int]:
+    # Замены последовательные, не одним проходом: путь файла внутри
+    # переименованной папки сначала получает новое имя файла, а затем
+    # более короткий ключ папки переписывает и её.
+    # str.count/str.replace дают те же непересекающиеся совпадения, что и
+    # re.subn(re.escape(old)), без regex; отсутствующий ключ — один count.
     total = 0
-    for old, new in sorted(rename_map.items(), key=lambda item: len(item[0]), reverse=True):
-        if not old or old == new:
-            continue
-        text, count = re.subn(re.escape(old), new, text)
-        total += count
+    for old, new in renames:
+        count = text.count(old)
+        if count:
+            text = text.replace(old, new)
+            total += count
     return text, total
 
 
+def _count_text_leftovers(
+    text: str, critical: dict[str, int], warnings: dict[str, int]
+) -> None:
+    """Добавляет в счётчики остатки, найденные в тексте одного файла."""
+    for label, pattern in _CRITICAL_PATTERNS:
+        count = len(pattern.findall(text))
+        if count:
+            critical[label] = critical.get(label, 0) + count
+    for label, pattern in _WARNING_PATTERNS:
+        count = len(pattern.findall(text))
+        if count:
+            warnings[label] = warnings.get(label, 0) + count
+
+
+def _count_name_leftovers(names: list[str], critical: dict[str, int]) -> None:
+    for name in names:
+        longest = max(
+            (len(match.group(0)) for match in _FILENAME_LEFTOVER_RE.finditer(name)),
+            default=0,
+        )
+        if longest:
+            label = _FILENAME_LEFTOVER_LABELS[longest]
+            critical[label] = critical.get(label, 0) + 1
+
+
+def _collect_tree(project_root: Path) -> tuple[list[Path], list[str]]:
+    """Один обход проекта: текстовые файлы для переписывания и имена всех путей."""
+    suffixes = utils.extension_suffixes(TEXT_EXTENSIONS)
+    text_files: list[Path] = []
+    names: list[str] = []
+    for entry, _relative in utils.iter_files(project_root, include_dirs=True):
+        names.append(entry.name)
+        if utils.has_extension(entry.name, suffixes) and not entry.is_dir(follow_symlinks=False):
+            text_files.append(Path(entry.path))
+    return text_files, names
+
+
 def scan_leftovers(project_root: Path) -> tuple[dict[str, int], dict[str, int]]:
+    text_files, names = _collect_tree(Path(project_root))
     critical: dict[str, int] = {}
     warnings: dict[str, int] = {}
-    for path in utils.list_files_recursive(project_root, extensions=TEXT_EXTENSIONS):
+    for path in text_files:
         try:
             text = utils.safe_read(path)
         except Exception:
             continue
-        for label, pattern in _CRITICAL_PATTERNS:
-            count = len(pattern.findall(text))
-            if count:
-                critical[label] = critical.get(label, 0) + count
-        for label, pattern in _WARNING_PATTERNS:
-            count = len(pattern.findall(text))
-            if count:
-                warnings[label] = warnings.get(label, 0) + count
-
-    for path in project_root.rglob("*"):
-        if not path.exists():
-            continue
-        name = path.name
-        if re.search(r"\btilda", name, re.IGNORECASE):
-            critical["filename tilda"] = critical.get("filename tilda", 0) + 1
-        elif re.search(r"\btild", name, re.IGNORECASE):
-            critical["filename tild"] = critical.get("filename tild", 0) + 1
-        elif re.search(r"\btil", name, re.IGNORECASE):
-            critical["filename til"] = critical.get("filename til", 0) + 1
-
+        _count_text_leftovers(text, critical, warnings)
+    _count_name_leftovers(names, critical)
     return critical, warnings
 
 
@@ -319,9 +361,16 @@ def rewrite_project_namespace(project_root: Path) -> NamespaceRewriteResult:
     project_root = Path(project_root)
     result = NamespaceRewriteResult()
     rename_map, renamed_paths = _rename_namespace_paths(project_root)
+    renames = _ordered_renames(rename_map)
     result.renamed_paths = renamed_paths
 
-    for path in utils.list_files_recursive(project_root, extensions=TEXT_EXTENSIONS):
+    # После переименований дерево больше не меняется — один обход служит
+    # и для переписывания текста, и для поиска остатков. Остатки считаются
+    # по итоговому тексту в памяти, без повторного чтения файла с диска.
+    text_files, names = _collect_tree(project_root)
+    critical: dict[str, int] = {}
+    warnings: dict[str, int] = {}
+    for path in text_files:
         result.files_checked += 1
         try:
             original = utils.safe_read(path)
@@ -331,7 +380,7 @@ def rewrite_project_namespace(project_root: Path) -> NamespaceRewriteResult:
 
         text = original
         replacements = 0
-        text, count = _apply_rename_map(text, rename_map)
+        text, count = _apply_rename_map(text, renames)
         replacements += count
         text, count = rewrite_text(text, path.suffix)
         replacements += count
@@ -339,6 +388,7 @@ def rewrite_project_namespace(project_root: Path) -> NamespaceRewriteResult:
         replacements += count
         text, count = _ensure_zero_forms_bridge(text, path.name)
         replacements += count
+        _count_text_leftovers(text, critical, warnings)
 
         if text != original:
             utils.safe_write(path, text)
@@ -349,7 +399,7 @@ def rewrite_project_namespace(project_root: Path) -> NamespaceRewriteResult:
                 f"{utils.relpath(path, project_root)} ({replacements})"
             )
 
-    critical, warnings = scan_leftovers(project_root)
+    _count_name_leftovers(names, critical)
     result.critical_leftovers = critical
     result.warning_leftovers = warnings
     result.report_path = _write_report(project_root, result)
@@ -27,8 +27,9 @@ from core.htaccess import collect_routes
 __all__ = ["update_all_refs_in_project"]
 
 
-def _should_skip(url: str, ignore_prefixes: Iterable[str]) -> bool:
-    return any(url.startswith(prefix) for prefix in ignore_prefixes)
+def _should_skip(url: str, ignore_prefixes: tuple[str, ...]) -> bool:
+    # str.startswith(tuple) перебирает префиксы в C, без генератора на каждую ссылку
+    return url.startswith(ignore_prefixes)
 
 
 def _is_internal_anchor(url: str) -> bool:
@@ -371,7 +372,7 @@ def _update_links_in_html(
     rename_map: Dict[str, str],
     project_root: Path,
     current_path: Path,
-    ignore_prefixes: Iterable[str],
+    ignore_prefixes: tuple[str, ...],
     link_rel_patterns: Iterable[re.Pattern[str]],
     replace_patterns: Iterable[re.Pattern[str]],
     comment_patterns: Iterable[re.Pattern[str]],
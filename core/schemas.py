@@ -196,6 +196,8 @@ class RemoteAssetsConfig(BaseModel):
     """Настройки скачивания ресурсов с CDN Tilda (assets.py)."""
     scan_extensions: List[str] = Field(default_factory=list)  # в каких файлах искать ссылки
     rules: List[RemoteAssetRule] = Field(default_factory=list)  # куда класть скачанные файлы
+    # Кэш скачанных файлов между запусками (путь от корня deTilda); "" — выключен
+    cache_dir: str = ""
 
 
 class FileListConfig(BaseModel):
@@ -233,6 +235,9 @@ class NormalizeCaseConfig(BaseModel):
     """Настройки нормализации регистра имён файлов (assets.py)."""
     enabled: bool = True  # включено по умолчанию
     extensions: List[str] = Field(default_factory=list)
+    # Приводить к нижнему регистру относительные ссылки в HTML/CSS, даже если
+    # файлы не переименовывались. false — без переименований текст не читается
+    lowercase_relative_links: bool = True
 
 
 class BrowserRuntimeAssetsConfig(BaseModel):
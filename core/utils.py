@@ -7,17 +7,24 @@
 from __future__ import annotations
 
 import json
+import mmap
+import os
 import shutil
 import time
 from contextvars import ContextVar
 from pathlib import Path
-from typing import Sequence
+from typing import Iterator, Sequence
 
 from core import logger
 
 __all__ = [
+    "decode_text",
     "ensure_dir",
+    "extension_suffixes",
+    "file_contains_any",
     "get_elapsed_time",
+    "has_extension",
+    "iter_files",
     "list_files_recursive",
     "load_manifest",
     "relpath",
@@ -39,13 +46,48 @@ def _to_path(path: Path | str) -> Path:
 def safe_read(path: Path | str) -> str:
     """Читает файл как UTF-8 строку. Обрабатывает BOM (utf-8-sig) как запасной вариант."""
     path_obj = _to_path(path)
-    if not path_obj.exists():
-        raise FileNotFoundError(f"Файл не найден: {path_obj}")
+    # Файл читается один раз, декодирование с запасным вариантом — в памяти
     try:
-        return path_obj.read_text(encoding="utf-8")
+        data = path_obj.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Файл не найден: {path_obj}") from None
+    return decode_text(data)
+
+
+def decode_text(data: bytes) -> str:
+    """Декодирует содержимое файла так же, как safe_read().
+
+    Для вызывающих, которые сначала проверяют сырые bytes (например, на
+    наличие подстроки) и декодируют только нужные файлы.
+    """
+    try:
+        text = data.decode("utf-8")
     except UnicodeDecodeError:
         # Некоторые Windows-редакторы сохраняют файлы с BOM-маркером
-        return path_obj.read_text(encoding="utf-8-sig")
+        text = data.decode("utf-8-sig")
+    # Universal newlines, как у read_text(): \r\n и \r → \n
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def file_contains_any(path: Path | str, needles: Sequence[bytes]) -> bool:
+    """Проверяет, встречается ли в файле хотя бы одна из byte-строк needles.
+
+    Файл отображается в память (mmap) — без чтения и декодирования в str,
+    ядро подгружает страницы по требованию. При ошибке mmap возвращает True,
+    чтобы вызывающий код перешёл к обычному чтению, а не пропустил файл.
+    """
+    if not needles:
+        return False
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return any(mapped.find(needle) != -1 for needle in needles)
+    except (OSError, ValueError):
+        return True
 
 
 def safe_write(path: Path | str, content: str) -> None:
@@ -53,8 +95,13 @@ def safe_write(path: Path | str, content: str) -> None:
     if _dry_run.get():
         return
     path_obj = _to_path(path)
-    path_obj.parent.mkdir(parents=True, exist_ok=True)
-    path_obj.write_text(content, encoding="utf-8", newline="\n")
+    # Почти всегда файл перезаписывается на месте (обновление ссылок) —
+    # папку создаём только если её нет, без mkdir-syscall на каждую запись
+    try:
+        path_obj.write_text(content, encoding="utf-8", newline="\n")
+    except FileNotFoundError:
+        path_obj.parent.mkdir(parents=True, exist_ok=True)
+        path_obj.write_text(content, encoding="utf-8", newline="\n")
 
 
 def safe_copy(src: Path | str, dst: Path | str) -> None:
@@ -95,22 +142,73 @@ def ensure_dir(path: Path | str) -> Path:
     return path_obj
 
 
+def iter_files(
+    base_dir: Path | str, *, include_dirs: bool = False
+) -> Iterator[tuple[os.DirEntry[str], str]]:
+    """Рекурсивно обходит папку через os.scandir и отдаёт (DirEntry, relpath).
+
+    relpath — путь относительно base_dir с "/" в качестве разделителя.
+    Тип файла берётся из кэша DirEntry — без отдельного stat() на каждый путь,
+    как у rglob("*") + is_file(). Порядок не определён: если нужен
+    детерминированный порядок — сортируйте результат по relpath.
+    include_dirs=True — папки тоже попадают в результат (отличать через
+    entry.is_dir(follow_symlinks=False), значение уже закэшировано).
+    """
+    stack: list[tuple[str, str]] = [(os.fspath(base_dir), "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    relative = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, relative + "/"))
+                        if include_dirs:
+                            yield entry, relative
+                    elif entry.is_file():
+                        yield entry, relative
+        except OSError:
+            continue
+
+
+def extension_suffixes(extensions: Sequence[str]) -> tuple[str, ...]:
+    """Готовит расширения для has_extension(): lowercase, только вида ".ext"."""
+    return tuple(
+        sorted({
+            ext.lower()
+            for ext in extensions
+            if isinstance(ext, str) and len(ext) > 1 and ext.startswith(".") and "." not in ext[1:]
+        })
+    )
+
+
+def has_extension(name: str, suffixes: tuple[str, ...]) -> bool:
+    """Аналог ``Path(name).suffix.lower() in suffixes`` без создания Path.
+
+    suffixes — результат extension_suffixes(). str.endswith(tuple) работает в C;
+    проверка rfind отсекает dot-файлы (".html" — это имя, а не расширение).
+    """
+    name_lower = name.lower()
+    return name_lower.endswith(suffixes) and name_lower.rfind(".") > 0
+
+
 def list_files_recursive(base_dir: Path | str, extensions: Sequence[str] | None = None) -> list[Path]:
     """Рекурсивно обходит папку и возвращает файлы с нужными расширениями.
 
     extensions: например [".html", ".css"] — регистр не важен.
     Если extensions не задан — возвращает все файлы.
+    Фильтр по расширению применяется к имени DirEntry до создания Path.
     """
-    base_path = _to_path(base_dir)
-    exts = {ext.lower() for ext in extensions or ()}
-    result: list[Path] = []
-    for file_path in base_path.rglob("*"):
-        if not file_path.is_file():
-            continue
-        if exts and file_path.suffix.lower() not in exts:
-            continue
-        result.append(file_path)
-    return result
+    if not extensions:
+        return [Path(entry.path) for entry, _relative in iter_files(base_dir)]
+    suffixes = extension_suffixes(extensions)
+    if not suffixes:
+        return []
+    return [
+        Path(entry.path)
+        for entry, _relative in iter_files(base_dir)
+        if has_extension(entry.name, suffixes)
+    ]
 
 
 def load_manifest() -> dict:
@@ -1,6 +1,8 @@
 import pytest
 import yaml
 
+from core import config_loader
+
 # Захватываем настоящий safe_load здесь — conftest импортируется pytest
 # раньше любого тест-файла, поэтому yaml ещё не подменён.
 _REAL_YAML_SAFE_LOAD = yaml.safe_load
@@ -17,8 +19,11 @@ def _restore_yaml_safe_load():
     там захватывает уже fake-функцию, а не настоящую.
 
     Фикстура снимает эту зависимость: каждый тест начинается и
-    заканчивается с настоящим yaml.safe_load.
+    заканчивается с настоящим yaml.safe_load. Кэш разобранных конфигов
+    сбрасывается по той же причине — он мог заполниться через fake-функцию.
     """
     yaml.safe_load = _REAL_YAML_SAFE_LOAD
+    config_loader._clear_parsed_cache()
     yield
     yaml.safe_load = _REAL_YAML_SAFE_LOAD
+    config_loader._clear_parsed_cache()
@@ -15,7 +15,7 @@ if "yaml" not in sys.modules:
     yaml_stub.safe_load = lambda *_args, **_kwargs: {}
     sys.modules["yaml"] = yaml_stub
 
-from core.archive import unpack_archive
+from core.archive import _extract_all, _member_arcname, unpack_archive
 
 
 def _make_zip(zip_path: Path, files: dict[str, str]) -> None:
@@ -84,3 +84,139 @@ def test_unpack_replaces_existing_target(tmp_path: Path) -> None:
     assert result == existing
     assert (existing / "new.html").exists()
     assert not (existing / "old.html").exists()  # старый файл удалён вместе с папкой
+
+
+def test_unpack_keeps_unsafe_member_paths_inside_target(tmp_path: Path) -> None:
+    """Элементы с '..' и ведущим слешем не выходят за пределы папки проекта."""
+    zip_path = tmp_path / "work" / "myarchive.zip"
+    zip_path.parent.mkdir()
+    _make_zip(zip_path, {
+        "index.html": "<html></html>",
+        "../escape.txt": "x",
+        "/abs/file.txt": "y",
+    })
+
+    result = unpack_archive(zip_path)
+
+    assert result == zip_path.parent / "myarchive"
+    assert (result / "index.html").read_text() == "<html></html>"
+    assert (result / "escape.txt").read_text() == "x"
+    assert (result / "abs" / "file.txt").read_text() == "y"
+    assert not (tmp_path / "escape.txt").exists()
+
+
+def test_unpack_extracts_many_members_in_parallel(tmp_path: Path) -> None:
+    """Параллельная распаковка сохраняет содержимое каждого файла."""
+    zip_path = tmp_path / "project12345.zip"
+    files = {f"project12345/images/img{i}.txt": f"content-{i}" * 100 for i in range(50)}
+    _make_zip(zip_path, files)
+
+    result = unpack_archive(zip_path)
+
+    assert result == tmp_path / "project12345"
+    for arcname, content in files.items():
+        assert (tmp_path / arcname).read_text() == content
+
+
+def _extractall_layout(zip_path: Path, target: Path) -> dict[str, str]:
+    """Файлы, которые создаёт ZipFile.extractall() — эталон санитизации имён."""
+    with zipfile.ZipFile(zip_path) as zf:
+        zf.extractall(target)
+    return {
+        path.relative_to(target).as_posix(): path.read_text()
+        for path in target.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_unpack_sanitizes_drive_letter_and_backslash_names_like_extractall(
+    tmp_path: Path,
+) -> None:
+    """Буквы дисков и обратные слеши обрабатываются так же, как в extractall()."""
+    zip_path = tmp_path / "work" / "myarchive.zip"
+    zip_path.parent.mkdir()
+    _make_zip(zip_path, {
+        "index.html": "<html></html>",
+        "D:evil.txt": "drive-relative",
+        "C:\\x\\y.txt": "drive-absolute",
+        "a\\b.txt": "backslash",
+        "css/C:style.css": "nested-drive",
+    })
+
+    result = unpack_archive(zip_path)
+
+    assert result == zip_path.parent / "myarchive"
+    unpacked = {
+        path.relative_to(result).as_posix(): path.read_text()
+        for path in result.rglob("*")
+        if path.is_file()
+    }
+    assert unpacked == _extractall_layout(zip_path, tmp_path / "reference")
+    assert sorted(p.name for p in zip_path.parent.iterdir()) == ["myarchive", "myarchive.zip"]
+    for path in result.rglob("*"):
+        assert path.resolve().is_relative_to(result.resolve())
+
+
+def test_unpack_skips_member_written_through_symlink_outside_target(tmp_path: Path) -> None:
+    """Элемент, путь которого ведёт наружу через симлинк в папке, не записывается."""
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    zip_path = tmp_path / "work" / "project12345.zip"
+    zip_path.parent.mkdir()
+    _make_zip(zip_path, {
+        "project12345/index.html": "<html></html>",
+        "project12345/link/escape.txt": "x",
+    })
+
+    with zipfile.ZipFile(zip_path) as handle:
+        target = zip_path.parent
+        (target / "project12345").mkdir()
+        (target / "project12345" / "link").symlink_to(outside, target_is_directory=True)
+        _extract_all(handle, target)
+
+    assert (target / "project12345" / "index.html").read_text() == "<html></html>"
+    assert not (outside / "escape.txt").exists()
+
+
+def test_member_arcname_windows_branch_matches_zipfile_rules() -> None:
+    """Ветка Windows (через ntpath): splitdrive всего имени, «_» вместо «:»."""
+    import ntpath
+
+    cases = {
+        "D:evil.txt": "evil.txt",
+        "C:\\x\\y.txt": "x\\y.txt",
+        "css/C:style.css": "css\\C_style.css",
+        "a./b?.txt": "a\\b_.txt",
+        "../x/./y": "x\\y",
+        "//server/share/f.txt": "f.txt",
+    }
+    for name, expected in cases.items():
+        assert _member_arcname(name, ntpath) == expected, name
+
+    # Завершающие пробелы частей обрабатываются так же, как у текущего zipfile
+    assert _member_arcname("dir /a.txt", ntpath) == zipfile.ZipFile._sanitize_windows_name(
+        "dir \\a.txt", "\\"
+    )
+
+
+def test_extract_all_keeps_last_of_case_colliding_members(tmp_path: Path, monkeypatch) -> None:
+    """«A.css» и «a.css» — один файл на Windows/macOS: пишется только последний."""
+    import core.archive as archive_module
+
+    zip_path = tmp_path / "case.zip"
+    _make_zip(zip_path, {"css/A.css": "first", "css/a.css": "second", "css/b.css": "b"})
+    copied: list[tuple[str, str]] = []
+    original_copy = archive_module._copy_member
+
+    def _recording_copy(handle, info, destination):
+        copied.append((info.filename, destination.name))
+        original_copy(handle, info, destination)
+
+    monkeypatch.setattr(archive_module, "_copy_member", _recording_copy)
+    target = tmp_path / "out"
+    target.mkdir()
+    with zipfile.ZipFile(zip_path) as handle:
+        _extract_all(handle, target)
+
+    assert sorted(copied) == [("css/a.css", "a.css"), ("css/b.css", "b.css")]
+    assert (target / "css" / "a.css").read_text() == "second"
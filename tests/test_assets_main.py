@@ -1,10 +1,13 @@
 """Tests for core.assets — main rename_and_cleanup_assets flow."""
 from __future__ import annotations
 
+import re
 import sys
 import types
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
@@ -14,7 +17,8 @@ if "yaml" not in sys.modules:
     yaml_stub.safe_load = lambda *_args, **_kwargs: {}
     sys.modules["yaml"] = yaml_stub
 
-from core.assets import AssetResult, rename_and_cleanup_assets
+from core import assets as assets_module
+from core.assets import AssetResult, _sanitize, rename_and_cleanup_assets
 from core.schemas import ImagesConfig, PatternsConfig, ServiceFilesConfig
 
 
@@ -57,6 +61,149 @@ def test_renames_files_with_til_prefix(tmp_path: Path) -> None:
     assert result.stats.renamed >= 1
 
 
+def test_rename_skips_when_target_name_exists(tmp_path: Path, capsys) -> None:
+    """Если файл с новым именем уже есть — оба файла остаются, в rename_map пусто."""
+    (tmp_path / "tilda-block.css").write_text("old", encoding="utf-8")
+    (tmp_path / "aida-block.css").write_text("existing", encoding="utf-8")
+
+    result = rename_and_cleanup_assets(tmp_path, loader=_FakeLoader())
+
+    assert (tmp_path / "tilda-block.css").read_text(encoding="utf-8") == "old"
+    assert (tmp_path / "aida-block.css").read_text(encoding="utf-8") == "existing"
+    assert "tilda-block.css" not in result.rename_map
+    assert result.stats.renamed == 0
+    assert "Пропуск переименования из-за конфликта: tilda-block.css" in capsys.readouterr().out
+
+
+class _ClassPatternLoader(_FakeLoader):
+    """til_to_ai_filename без выделяемого литерала — prefilter не применяется."""
+
+    def patterns(self) -> PatternsConfig:
+        return PatternsConfig.model_validate({
+            "assets": {"til_to_ai_filename": r"\bt[i]l"},
+            "text_extensions": [".html"],
+        })
+
+
+def test_renames_with_non_literal_til_pattern(tmp_path: Path) -> None:
+    (tmp_path / "tilda-block.css").write_text("body{}")
+
+    rename_and_cleanup_assets(tmp_path, loader=_ClassPatternLoader())
+
+    assert (tmp_path / "aida-block.css").exists()
+
+
+def test_sanitize_filename() -> None:
+    assert _sanitize("aida Block (1), final.css") == "aida_Block_1_final.css"
+    assert _sanitize("a & b__c.js") == "a_and_b_c.js"
+    assert _sanitize("plain.css") == "plain.css"
+
+
+def test_split_name_matches_path_stem_and_suffix() -> None:
+    for name in ("tilda.js", ".htaccess", "til.", "..til", "a.tar.gz", "noext"):
+        assert assets_module._split_name(name) == (Path(name).stem, Path(name).suffix)
+
+
+def test_project_relpath_matches_utils_relpath(tmp_path: Path) -> None:
+    from core import utils
+
+    nested = tmp_path / "css" / "sub" / "style.css"
+    prefix = assets_module._root_prefix(tmp_path)
+    assert assets_module._project_relpath(nested, prefix) == "css/sub/style.css"
+    assert assets_module._project_relpath(nested, prefix) == utils.relpath(nested, tmp_path)
+    # Путь вне проекта — как utils.relpath(): только имя файла
+    outside = tmp_path.parent / "other.css"
+    assert assets_module._project_relpath(outside, prefix) == "other.css"
+
+
+def test_config_link_patterns_match_the_same_as_str_and_bytes() -> None:
+    """Паттерны ссылок из config.yaml: str- и bytes-версии находят одни и те же ссылки."""
+    from core.config_loader import ConfigLoader
+
+    link_patterns = ConfigLoader(ROOT).patterns().links
+    if not link_patterns:  # pragma: no cover - yaml подменён заглушкой
+        pytest.skip("config.yaml не загружен")
+    text = (
+        '<IMG SRC = "img/A.png"><a\thref=\'/Page.html\'>\x0bsrcset="a.webp 2x"'
+        '<div data-src="lazy.jpg" style="background:URL(\'bg.png\')"></div>'
+        "x{background:url(img/b.svg)} action=\f'send.php'"
+    )
+    compiled = assets_module._compile_link_patterns(link_patterns)
+    compiled_bytes = assets_module._compile_link_patterns_bytes(link_patterns)
+
+    assert compiled_bytes is not None
+    assert all(isinstance(regex, re.Pattern) for regex in compiled)
+    links = list(assets_module._iter_links(text, compiled))
+    assert len(links) == 8  # data-src= находят и src-, и data-src-паттерн
+    assert list(assets_module._iter_links_bytes(text.encode("ascii"), compiled_bytes)) == links
+
+
+@pytest.fixture
+def safe_read_calls(monkeypatch) -> list[Path]:
+    """Пути, прочитанные через utils.safe_read (то есть мимо _TextCache)."""
+    reads: list[Path] = []
+    original_read = assets_module.utils.safe_read
+
+    def _counting_read(path):
+        reads.append(Path(path))
+        return original_read(path)
+
+    monkeypatch.setattr(assets_module.utils, "safe_read", _counting_read)
+    return reads
+
+
+def test_text_cache_reuses_text_and_revalidates(tmp_path: Path, safe_read_calls) -> None:
+    """Повторное чтение берётся из кэша; изменённый файл и вытеснение — с диска."""
+    first = tmp_path / "a.html"
+    second = tmp_path / "b.html"
+    first.write_text("aaaa", encoding="utf-8")
+    second.write_text("bbbb", encoding="utf-8")
+
+    cache = assets_module._TextCache(max_bytes=6)
+
+    assert cache.read(first) == "aaaa"
+    assert cache.read(first) == "aaaa"
+    assert safe_read_calls == [first]
+
+    renamed = tmp_path / "renamed.html"
+    first.rename(renamed)
+    cache.move(first, renamed)
+    assert cache.read(renamed) == "aaaa"
+    assert safe_read_calls == [first]
+
+    renamed.write_text("changed", encoding="utf-8")
+    assert cache.read(renamed) == "changed"
+    assert safe_read_calls == [first, renamed]
+
+    # "changed" (7 байт) больше предела — не кэшируется; b.html помещается в кэш
+    assert cache.read(second) == "bbbb"
+    assert cache.read(second) == "bbbb"
+    assert safe_read_calls == [first, renamed, second]
+
+
+def test_text_cache_move_over_cached_file_releases_its_budget(
+    tmp_path: Path, safe_read_calls
+) -> None:
+    """move() поверх закэшированного файла не оставляет в бюджете его размер."""
+    source = tmp_path / "til-a.html"
+    target = tmp_path / "ai-a.html"
+    other = tmp_path / "c.html"
+    source.write_text("aaaa", encoding="utf-8")
+    target.write_text("bbbb", encoding="utf-8")
+    other.write_text("ccccc", encoding="utf-8")
+
+    cache = assets_module._TextCache(max_bytes=10)
+    cache.read(source)
+    cache.read(target)
+
+    source.replace(target)
+    cache.move(source, target)
+    # 4 байта ai-a.html + 5 байт c.html помещаются в 10 — ничего не вытесняется
+    cache.read(other)
+    assert cache.read(target) == "aaaa"
+    assert safe_read_calls == [source, target, other]
+
+
 def test_deletes_as_is_files(tmp_path: Path) -> None:
     """Файлы из delete_physical_files.as_is удаляются."""
     (tmp_path / "tildacopy.png").write_bytes(b"fake")
@@ -128,6 +275,22 @@ def test_invalid_regex_pattern_logged_and_skipped(tmp_path: Path) -> None:
     assert (tmp_path / "keep.png").exists()
 
 
+def test_rename_errors_beyond_limit_are_summarized(tmp_path: Path, monkeypatch, capsys) -> None:
+    limit = assets_module._RENAME_ERROR_LOG_LIMIT
+    for i in range(limit + 5):
+        (tmp_path / f"tilda-{i:03d}.js").write_text("x", encoding="utf-8")
+
+    def _fail(*_args):
+        raise PermissionError("denied")
+
+    monkeypatch.setattr(assets_module, "_replace_file", _fail)
+    rename_and_cleanup_assets(tmp_path, loader=_FakeLoader())
+
+    out = capsys.readouterr().out
+    assert out.count("Ошибка переименования") == limit
+    assert f"Ошибок переименования: {limit + 5}" in out
+
+
 def test_excluded_files_not_renamed(tmp_path: Path) -> None:
     """Файлы из exclude_from_rename не переименовываются."""
     (tmp_path / "robots.txt").write_text("Disallow: /tilda")
@@ -162,6 +325,37 @@ def test_creates_1px_placeholder(tmp_path: Path) -> None:
     assert placeholder.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
 
 
+def test_keeps_existing_1px_placeholder(tmp_path: Path) -> None:
+    """Уже лежащий в проекте images/1px.png не перезаписывается."""
+    placeholder = tmp_path / "images" / "1px.png"
+    placeholder.parent.mkdir()
+    placeholder.write_bytes(b"custom")
+
+    rename_and_cleanup_assets(tmp_path, loader=_FakeLoader())
+
+    assert placeholder.read_bytes() == b"custom"
+
+
+def test_recreates_1px_placeholder_renamed_by_custom_til_pattern(tmp_path: Path) -> None:
+    """til_to_ai_filename переименовал images/1px.png — placeholder создаётся заново."""
+
+    class _Loader(_FakeLoader):
+        def patterns(self) -> PatternsConfig:
+            return PatternsConfig.model_validate({
+                "assets": {"til_to_ai_filename": r"1px"},
+                "text_extensions": [".html"],
+            })
+
+    placeholder = tmp_path / "images" / "1px.png"
+    placeholder.parent.mkdir()
+    placeholder.write_bytes(b"custom")
+
+    rename_and_cleanup_assets(tmp_path, loader=_Loader())
+
+    assert (tmp_path / "images" / "ai.png").read_bytes() == b"custom"
+    assert placeholder.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+
 def test_raises_when_loader_missing(tmp_path: Path) -> None:
     """Без loader должен упасть с понятной ошибкой."""
     try:
@@ -205,6 +399,34 @@ class _RemoteAssetLoader(_FakeLoader):
         })
 
 
+def test_connection_reset_mid_download_is_logged_as_download_failure(
+    tmp_path: Path, monkeypatch
+) -> None:
+    """Обрыв соединения — предупреждение о скачивании, а не ошибка записи."""
+    import core.assets as assets_module
+
+    page = tmp_path / "index.html"
+    page.write_text(
+        '<script src="https://static.tildacdn.com/js/tilda-extra.js"></script>',
+        encoding="utf-8",
+    )
+
+    def _fake_fetch(_url: str, _destination: Path, **_kwargs) -> bool:
+        raise ConnectionResetError(104, "Connection reset by peer")
+
+    warnings: list[str] = []
+    errors: list[str] = []
+    monkeypatch.setattr("core.assets.fetch_to_file", _fake_fetch)
+    monkeypatch.setattr(assets_module.logger, "warn", warnings.append)
+    monkeypatch.setattr(assets_module.logger, "err", errors.append)
+
+    result = rename_and_cleanup_assets(tmp_path, loader=_RemoteAssetLoader())
+
+    assert result.stats.downloaded == 0
+    assert errors == []
+    assert any("Не удалось скачать" in message for message in warnings)
+
+
 def test_ssl_bypass_download_is_counted_but_not_warning(tmp_path: Path, monkeypatch) -> None:
     """SSL fallback stays visible in stats but does not make pipeline warn by itself."""
     page = tmp_path / "index.html"
@@ -213,10 +435,11 @@ def test_ssl_bypass_download_is_counted_but_not_warning(tmp_path: Path, monkeypa
         encoding="utf-8",
     )
 
-    def _fake_fetch(_url: str):
-        return b"console.log('ok')", True
+    def _fake_fetch(_url: str, destination: Path, **_kwargs) -> bool:
+        destination.write_bytes(b"console.log('ok')")
+        return True
 
-    monkeypatch.setattr("core.assets.fetch_bytes", _fake_fetch)
+    monkeypatch.setattr("core.assets.fetch_to_file", _fake_fetch)
 
     result = rename_and_cleanup_assets(tmp_path, loader=_RemoteAssetLoader())
 
@@ -225,6 +448,122 @@ def test_ssl_bypass_download_is_counted_but_not_warning(tmp_path: Path, monkeypa
     assert result.stats.warnings == 0
 
 
+def test_remote_downloads_run_for_every_url_and_skip_failures(tmp_path: Path, monkeypatch) -> None:
+    """Параллельная загрузка: ошибка одного URL не мешает остальным."""
+    import urllib.error
+
+    page = tmp_path / "index.html"
+    page.write_text(
+        "".join(
+            f'<script src="https://static.tildacdn.com/js/tilda-{i}.js"></script>'
+            for i in range(5)
+        )
+        + '<script src="https://static.tildacdn.com/js/tilda-broken.js"></script>',
+        encoding="utf-8",
+    )
+
+    def _fake_fetch(url: str, destination: Path, **_kwargs) -> bool:
+        if "broken" in url:
+            raise urllib.error.URLError("boom")
+        destination.write_bytes(url.encode())
+        return False
+
+    monkeypatch.setattr("core.assets.fetch_to_file", _fake_fetch)
+
+    result = rename_and_cleanup_assets(tmp_path, loader=_RemoteAssetLoader())
+
+    assert result.stats.downloaded == 5
+    assert not (tmp_path / "js" / "aida-broken.js").exists()
+    assert (tmp_path / "js" / "aida-3.js").read_bytes() == b"https://static.tildacdn.com/js/tilda-3.js"
+
+
+def test_remote_links_scanned_as_bytes_match_text_scan(tmp_path: Path, monkeypatch) -> None:
+    """ASCII-файл сканируется как bytes без safe_read; не-ASCII, CRLF и \\x1c-\\x1f — текстом."""
+    (tmp_path / "ascii.html").write_text(
+        '<script SRC="https://static.tildacdn.com/js/tilda-a.js"></script>', encoding="utf-8"
+    )
+    (tmp_path / "cyrillic.html").write_text(
+        'Привет <script src="https://static.tildacdn.com/js/tilda-b.js"></script>',
+        encoding="utf-8",
+    )
+    (tmp_path / "crlf.html").write_bytes(
+        b'<p>\r\n<script src="//static.tildacdn.com/js/tilda-c.js"></script>'
+    )
+    # \x1c — пробельный для str-\s, но не для bytes-\s
+    (tmp_path / "separator.html").write_bytes(
+        b'<script src\x1c="https://static.tildacdn.com/js/tilda-d.js"></script>'
+    )
+    (tmp_path / "plain.html").write_text('<img src="img/a.png">', encoding="utf-8")
+
+    reread: list[str] = []
+    original_safe_read = assets_module.utils.safe_read
+
+    def _recording_safe_read(path):
+        reread.append(Path(path).name)
+        return original_safe_read(path)
+
+    decoded: list[bytes] = []
+    original_decode = assets_module.utils.decode_text
+
+    def _recording_decode(data: bytes) -> str:
+        decoded.append(data)
+        return original_decode(data)
+
+    fetched: list[str] = []
+
+    def _fake_fetch(url: str, destination: Path, **_kwargs) -> bool:
+        fetched.append(url)
+        destination.write_bytes(b"")
+        return False
+
+    monkeypatch.setattr(assets_module.utils, "safe_read", _recording_safe_read)
+    monkeypatch.setattr(assets_module.utils, "decode_text", _recording_decode)
+    monkeypatch.setattr("core.assets.fetch_to_file", _fake_fetch)
+
+    loader = _RemoteAssetLoader()
+    downloaded, _warnings, _ssl = assets_module._download_remote_assets(
+        tmp_path, loader.patterns(), loader.service_files(), loader.base_dir
+    )
+
+    assert downloaded == 4
+    assert sorted(fetched) == [
+        "//static.tildacdn.com/js/tilda-c.js",
+        "https://static.tildacdn.com/js/tilda-a.js",
+        "https://static.tildacdn.com/js/tilda-b.js",
+        "https://static.tildacdn.com/js/tilda-d.js",
+    ]
+    # Отклонённые bytes-путём файлы декодируются из уже прочитанных bytes
+    assert len(decoded) == 3
+    assert reread == []
+
+
+def test_pattern_invalid_as_bytes_sends_every_file_to_text_scan(
+    tmp_path: Path, monkeypatch
+) -> None:
+    """Паттерн, который компилируется только как str (\\uXXXX), не теряет ссылки."""
+    pattern = r"(?i)\bsrc\s*=\s*[\"'](?P<link>[^\"'\u0020]+)[\"']"
+    assert assets_module._compile_link_patterns_bytes([pattern]) is None
+
+    (tmp_path / "ascii.html").write_text(
+        '<script src="https://static.tildacdn.com/js/tilda-a.js"></script>', encoding="utf-8"
+    )
+    fetched: list[str] = []
+
+    def _fake_fetch(url: str, destination: Path, **_kwargs) -> bool:
+        fetched.append(url)
+        destination.write_bytes(b"")
+        return False
+
+    monkeypatch.setattr("core.assets.fetch_to_file", _fake_fetch)
+    loader = _RemoteAssetLoader()
+    patterns_cfg = PatternsConfig.model_validate({"links": [pattern], "text_extensions": [".html"]})
+    assets_module._download_remote_assets(
+        tmp_path, patterns_cfg, loader.service_files(), loader.base_dir
+    )
+
+    assert fetched == ["https://static.tildacdn.com/js/tilda-a.js"]
+
+
 class _FaviconFallbackLoader(_FakeLoader):
     """Loader с правилами resource_copy для проверки if_missing."""
 
@@ -279,3 +618,40 @@ def test_resource_copy_without_if_missing_overwrites(tmp_path: Path) -> None:
 
     # images/favicon.ico — без if_missing, должен быть перетёрт
     assert (target_dir / "favicon.ico").read_bytes() != b"OLD_BYTES"
+
+
+class _ResourceOriginalsLoader(_FakeLoader):
+    """Loader с originals: Tilda-версия ресурса заменяется нашей."""
+
+    def service_files(self) -> ServiceFilesConfig:
+        return ServiceFilesConfig.model_validate({
+            "exclude_from_rename": {"files": []},
+            "scripts_to_delete": {"files": []},
+            "rename_map_output": {"filename": "{project}_rename_map.json", "location": "logs"},
+            "resource_copy": {
+                "files": [
+                    {
+                        "source": "favicon.ico",
+                        "destination": "images/favicon.ico",
+                        "originals": ["./images/TildaFavicon.ico", "tildafavicon.ico"],
+                    },
+                ],
+            },
+        })
+
+
+def test_resource_originals_replaced_by_path_and_by_name(tmp_path: Path) -> None:
+    """originals совпадают по пути и по имени в любой папке, без учёта регистра."""
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "tildafavicon.ico").write_bytes(b"tilda")
+    (tmp_path / "deep" / "nested").mkdir(parents=True)
+    (tmp_path / "deep" / "nested" / "TILDAFAVICON.ICO").write_bytes(b"tilda")
+    (tmp_path / "keep.ico").write_bytes(b"keep")
+
+    result = rename_and_cleanup_assets(tmp_path, loader=_ResourceOriginalsLoader())
+
+    assert not (tmp_path / "images" / "tildafavicon.ico").exists()
+    assert not (tmp_path / "deep" / "nested" / "TILDAFAVICON.ICO").exists()
+    assert (tmp_path / "keep.ico").read_bytes() == b"keep"
+    assert result.rename_map["images/tildafavicon.ico"] == "images/favicon.ico"
+    assert result.rename_map["deep/nested/TILDAFAVICON.ICO"] == "images/favicon.ico"
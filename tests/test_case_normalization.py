@@ -119,3 +119,124 @@ def test_case_normalization_does_not_break_js_identifiers(tmp_path: Path) -> Non
     assert "sizerWidth" in js_text
     # base64 payload сохранён
     assert "yH5BAEAAAA" in js_text
+
+
+def test_case_normalization_replaces_all_renamed_paths_in_one_pass(tmp_path: Path) -> None:
+    project_root = tmp_path
+    rename_map: dict[str, str] = {}
+    stats = AssetStats()
+    patterns_cfg = PatternsConfig.model_validate({"text_extensions": [".html", ".js"]})
+    _, service_cfg = _make_configs()
+
+    pages_dir = project_root / "pages"
+    pages_dir.mkdir()
+    (pages_dir / "About.html").write_text("about", encoding="utf-8")
+    (project_root / "Contacts.html").write_text("contacts", encoding="utf-8")
+    (project_root / "app.js").write_text(
+        'load("pages/About.html");load("./Contacts.html");',
+        encoding="utf-8",
+    )
+
+    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+
+    assert stats.renamed == 2
+    js_text = (project_root / "app.js").read_text(encoding="utf-8")
+    assert js_text == 'load("pages/about.html");load("./contacts.html");'
+
+
+def test_case_normalization_retargets_existing_rename_map_values(tmp_path: Path) -> None:
+    project_root = tmp_path
+    rename_map: dict[str, str] = {
+        "pages/tilda-About.html": "pages/aida-About.html",
+        "unrelated.html": "other.html",
+    }
+    stats = AssetStats()
+    patterns_cfg, service_cfg = _make_configs()
+
+    pages_dir = project_root / "pages"
+    pages_dir.mkdir()
+    (pages_dir / "aida-About.html").write_text("about", encoding="utf-8")
+
+    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+
+    assert rename_map["pages/tilda-About.html"] == "pages/aida-about.html"
+    assert rename_map["pages/aida-About.html"] == "pages/aida-about.html"
+    assert rename_map["aida-About.html"] == "aida-about.html"
+    assert rename_map["pages\\aida-About.html"] == "pages\\aida-about.html"
+    assert rename_map["unrelated.html"] == "other.html"
+
+
+def test_case_normalization_without_lowercase_links_keeps_unrelated_links(tmp_path: Path) -> None:
+    project_root = tmp_path
+    rename_map: dict[str, str] = {}
+    stats = AssetStats()
+    patterns_cfg, _ = _make_configs()
+    service_cfg = ServiceFilesConfig.model_validate({
+        "pipeline_stages": {
+            "normalize_case": {
+                "enabled": True,
+                "extensions": [".html"],
+                "lowercase_relative_links": False,
+            }
+        }
+    })
+
+    (project_root / "main.html").write_text('<a href="/Sub/Page"></a>', encoding="utf-8")
+
+    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+
+    assert stats.renamed == 0
+    assert (project_root / "main.html").read_text(encoding="utf-8") == '<a href="/Sub/Page"></a>'
+
+    (project_root / "Job.html").write_text("job", encoding="utf-8")
+    (project_root / "main.html").write_text(
+        '<a href="/Sub/Page"></a><a href="./Job.html"></a>', encoding="utf-8"
+    )
+
+    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+
+    assert stats.renamed == 1
+    assert (project_root / "main.html").read_text(encoding="utf-8") == (
+        '<a href="/Sub/Page"></a><a href="./job.html"></a>'
+    )
+
+
+class _NaiveAutomaton:
+    """Замена pyahocorasick.Automaton для теста: те же add_word/make_automaton/iter."""
+
+    def __init__(self) -> None:
+        self._words: dict[str, str] = {}
+
+    def add_word(self, key: str, value: str) -> None:
+        self._words[key] = value
+
+    def make_automaton(self) -> None:
+        pass
+
+    def iter(self, text: str):
+        for key, value in self._words.items():
+            start = text.find(key)
+            while start != -1:
+                yield start + len(key) - 1, value
+                start = text.find(key, start + 1)
+
+
+def test_case_normalization_uses_automaton_to_pick_present_keys(tmp_path: Path, monkeypatch) -> None:
+    from core import assets
+
+    monkeypatch.setattr(
+        assets, "_ahocorasick", types.SimpleNamespace(Automaton=_NaiveAutomaton)
+    )
+    project_root = tmp_path
+    rename_map: dict[str, str] = {}
+    stats = AssetStats()
+    patterns_cfg = PatternsConfig.model_validate({"text_extensions": [".html", ".js"]})
+    _, service_cfg = _make_configs()
+
+    (project_root / "About.html").write_text("about", encoding="utf-8")
+    (project_root / "Contacts.html").write_text("contacts", encoding="utf-8")
+    (project_root / "app.js").write_text('load("./About.html");', encoding="utf-8")
+
+    _apply_case_normalization(project_root, rename_map, stats, patterns_cfg, service_cfg)
+
+    assert (project_root / "app.js").read_text(encoding="utf-8") == 'load("./about.html");'
@@ -81,3 +81,56 @@ def test_body_file_reports_link_missing_in_both_contexts(tmp_path: Path) -> None
 
     assert result.checked == 1
     assert result.broken == 1
+
+
+def test_shared_asset_is_checked_once_on_disk(tmp_path: Path, monkeypatch) -> None:
+    """Ссылки на один файл с разных страниц проверяются одним exists()."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("", encoding="utf-8")
+    for name in ("a.html", "b.html", "c.html"):
+        (tmp_path / name).write_text('<link href="css/site.css">', encoding="utf-8")
+
+    probes: list[Path] = []
+    original_exists = Path.exists
+
+    def _counting_exists(self: Path, *args, **kwargs) -> bool:
+        if self.name == "site.css":
+            probes.append(self)
+        return original_exists(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "exists", _counting_exists)
+
+    result = check_links(tmp_path, _FakeLoader())
+
+    assert result.checked == 3
+    assert result.broken == 0
+    assert len(probes) == 1
+
+
+def test_repeated_broken_link_is_logged_once_per_page(tmp_path: Path, monkeypatch) -> None:
+    """Повторы одной битой ссылки на странице считаются, но в лог попадают один раз."""
+    from core import checker
+
+    (tmp_path / "index.html").write_text(
+        '<a href="missing.html">a</a><a href="missing.html">b</a>', encoding="utf-8"
+    )
+    warnings: list[str] = []
+    monkeypatch.setattr(checker.logger, "warn", warnings.append)
+
+    result = check_links(tmp_path, _FakeLoader())
+
+    assert result.checked == 2
+    assert result.broken == 2
+    assert len([w for w in warnings if "missing.html" in w]) == 1
+
+
+def test_strip_cache_busting_fast_path_matches_urlsplit_round_trip() -> None:
+    from urllib.parse import urlsplit, urlunsplit
+
+    from core.checker import _strip_cache_busting_param
+
+    for link in ("css/style.css", "/page", "../img/фото.png", "a b.html", "", "//cdn/x.js", " x.html"):
+        split = urlsplit(link)
+        expected = urlunsplit((split.scheme, split.netloc, split.path, split.query, ""))
+        assert _strip_cache_busting_param(link) == expected
+    assert _strip_cache_busting_param("js/app.js?t=123#top") == "js/app.js"
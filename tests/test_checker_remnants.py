@@ -73,6 +73,26 @@ def test_fixes_local_path_via_replace_rules(tmp_path: Path) -> None:
     assert result.total_occurrences == 0
 
 
+def test_overlapping_local_paths_are_fixed_independently(tmp_path: Path) -> None:
+    """Ссылка-префикс другой ссылки не портит её при замене."""
+    page = tmp_path / "page.html"
+    page.write_text(
+        '<a href="tilda.html">a</a><a href="tilda.html.bak">b</a>',
+        encoding="utf-8",
+    )
+    loader = _FakeLoader(replace_rules=[
+        {"pattern": r"^tilda\.html$", "replacement": "home.html"},
+        {"pattern": r"^tilda\.html\.bak$", "replacement": "old.html"},
+    ])
+
+    result = check_tilda_remnants(tmp_path, loader)
+
+    assert page.read_text(encoding="utf-8") == (
+        '<a href="home.html">a</a><a href="old.html">b</a>'
+    )
+    assert result.total_occurrences == 0
+
+
 def test_unfixable_local_path_increments_counter(tmp_path: Path) -> None:
     """Если replace_rules не помогли — увеличивается total_occurrences."""
     page = tmp_path / "page.html"
@@ -99,9 +119,11 @@ def test_absolute_url_downloads_locally(tmp_path: Path, monkeypatch) -> None:
     )
 
     # Мокаем скачивание
-    monkeypatch.setattr(
-        downloader, "fetch_bytes", lambda _url, **_kw: (b"png-data", False)
-    )
+    def _fake_fetch(_url, destination, **_kw):
+        destination.write_bytes(b"png-data")
+        return False
+
+    monkeypatch.setattr(downloader, "fetch_to_file", _fake_fetch)
 
     loader = _FakeLoader(download_rules=[
         {"folder": "images", "extensions": [".png"]},
@@ -189,3 +211,17 @@ def test_tilda_filename_case_insensitive(tmp_path: Path) -> None:
     result = check_tilda_remnants(tmp_path, _FakeLoader())
 
     assert len(result.tilda_filenames) == 1
+
+
+def test_tilda_filenames_in_subfolders_are_sorted_relpaths(tmp_path: Path) -> None:
+    """Имена из вложенных папок — относительные пути в порядке обхода по частям."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css-old").mkdir()
+    (tmp_path / "css" / "tilda-grid.css").write_text("", encoding="utf-8")
+    (tmp_path / "css-old" / "tilda-blocks.css").write_text("", encoding="utf-8")
+    (tmp_path / "tilda-dir").mkdir()
+    (tmp_path / "tilda-dir" / "plain.css").write_text("", encoding="utf-8")
+
+    result = check_tilda_remnants(tmp_path, _FakeLoader())
+
+    assert result.tilda_filenames == ["css/tilda-grid.css", "css-old/tilda-blocks.css"]
@@ -0,0 +1,306 @@
+"""Tests for core.downloader — streaming download to file."""
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import shutil
+import subprocess
+import sys
+import threading
+import types
+import urllib.error
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+if "yaml" not in sys.modules:
+    yaml_stub = types.ModuleType("yaml")
+    yaml_stub.safe_load = lambda *_args, **_kwargs: {}
+    sys.modules["yaml"] = yaml_stub
+
+from core import downloader
+
+
+class _FakeResponse(io.BytesIO):
+    def __init__(self, data: bytes, headers: dict[str, str] | None = None) -> None:
+        super().__init__(data)
+        self.headers = headers or {}
+
+
+class _CallableOpener:
+    def __init__(self, respond) -> None:
+        self._respond = respond
+
+    def open(self, _request, timeout=None):
+        return self._respond()
+
+
+def _patch_opener(monkeypatch, respond) -> None:
+    monkeypatch.setattr(downloader, "_OPENER", _CallableOpener(respond))
+
+
+def test_fetch_to_file_streams_body_to_destination(tmp_path: Path, monkeypatch) -> None:
+    _patch_opener(monkeypatch, lambda: _FakeResponse(b"x" * 3_000_000))
+    destination = tmp_path / "js" / "app.js"
+    destination.parent.mkdir()
+
+    ssl_bypassed = downloader.fetch_to_file("https://example.com/app.js", destination)
+
+    assert ssl_bypassed is False
+    assert destination.read_bytes() == b"x" * 3_000_000
+    assert [p.name for p in destination.parent.iterdir()] == ["app.js"]
+
+
+def test_fetch_to_file_decompresses_gzip(tmp_path: Path, monkeypatch) -> None:
+    _patch_opener(
+        monkeypatch,
+        lambda: _FakeResponse(gzip.compress(b"body{}"), {"Content-Encoding": "gzip"}),
+    )
+    destination = tmp_path / "style.css"
+
+    downloader.fetch_to_file("https://example.com/style.css", destination)
+
+    assert destination.read_bytes() == b"body{}"
+
+
+def test_fetch_to_file_leaves_no_partial_file_on_error(tmp_path: Path, monkeypatch) -> None:
+    def _fail():
+        raise urllib.error.URLError("boom")
+
+    _patch_opener(monkeypatch, _fail)
+    destination = tmp_path / "app.js"
+
+    with pytest.raises(urllib.error.URLError):
+        downloader.fetch_to_file("https://example.com/app.js", destination)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_ssl_failure_retries_through_shared_insecure_opener(monkeypatch) -> None:
+    import ssl
+
+    def _fail_ssl():
+        raise urllib.error.URLError(ssl.SSLError("bad cert"))
+
+    opened: list[str] = []
+
+    class _FakeOpener:
+        def open(self, request, timeout=None):
+            opened.append(request.full_url)
+            return _FakeResponse(b"ok")
+
+    fake_opener = _FakeOpener()
+    _patch_opener(monkeypatch, _fail_ssl)
+    monkeypatch.setattr(downloader, "_INSECURE_OPENER", fake_opener)
+    monkeypatch.setattr(downloader, "_SSL_BROKEN_HOSTS", set())
+
+    assert downloader.fetch_bytes("https://broken.example/a.js") == (b"ok", True)
+    # Второй URL того же хоста сразу идёт через insecure opener
+    assert downloader.fetch_bytes("https://broken.example/b.js") == (b"ok", True)
+    assert opened == ["https://broken.example/a.js", "https://broken.example/b.js"]
+
+
+def _make_self_signed_cert(tmp_path: Path) -> tuple[Path, Path]:
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl недоступен")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1", "-subj", "/CN=localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+@pytest.fixture
+def tls_server(tmp_path: Path):
+    """Локальный HTTPS-сервер (самоподписанный сертификат), тело ответа — путь запроса.
+
+    close_connection=True — сервер закрывает соединение после ответа, не
+    предупреждая клиента заголовком "Connection: close".
+    """
+    import ssl
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    cert, key = _make_self_signed_cert(tmp_path)
+    state = types.SimpleNamespace(peers=[], close_connection=False)
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            state.peers.append(self.client_address)
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            if state.close_connection:
+                self.close_connection = True
+
+        def log_message(self, *_args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert, key)
+    server.socket = server_context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    state.client_context = ssl.create_default_context(cafile=str(cert))
+    state.client_context.check_hostname = False
+    state.base = f"https://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keepalive_handler_reuses_connection_per_host(tls_server) -> None:
+    """Несколько запросов к одному хосту идут через одно TCP+TLS соединение."""
+    opener = downloader.urllib.request.build_opener(
+        downloader.urllib.request.ProxyHandler({}),
+        downloader._KeepAliveHTTPSHandler(tls_server.client_context),
+    )
+    bodies = []
+    for name in ("/a.js", "/b.css", "/c.png"):
+        with contextlib.closing(opener.open(tls_server.base + name, timeout=5)) as resp:
+            bodies.append(resp.read())
+
+    assert bodies == [b"/a.js", b"/b.css", b"/c.png"]
+    assert len(set(tls_server.peers)) == 1
+
+
+def test_keepalive_handler_retries_when_pooled_connection_went_stale(tls_server) -> None:
+    """Сервер закрыл соединение в простое — запрос повторяется на новом соединении."""
+    tls_server.close_connection = True
+    handler = downloader._KeepAliveHTTPSHandler(tls_server.client_context)
+    opener = downloader.urllib.request.build_opener(
+        downloader.urllib.request.ProxyHandler({}), handler
+    )
+    with contextlib.closing(opener.open(tls_server.base + "/a.js", timeout=5)) as resp:
+        first = resp.read()
+    assert sum(len(idle) for idle in handler._idle.values()) == 1
+    with contextlib.closing(opener.open(tls_server.base + "/b.css", timeout=5)) as resp:
+        second = resp.read()
+
+    assert (first, second) == (b"/a.js", b"/b.css")
+    assert len(set(tls_server.peers)) == 2
+
+
+def test_fetch_to_file_reuses_disk_cache_across_runs(tmp_path: Path, monkeypatch) -> None:
+    """Повторный URL (в т.ч. с другой схемой) копируется из кэша без обращения к сети."""
+    calls: list[int] = []
+
+    def _respond():
+        calls.append(1)
+        return _FakeResponse(b"cached-body")
+
+    _patch_opener(monkeypatch, _respond)
+    cache_dir = tmp_path / ".cache"
+    first = tmp_path / "run1" / "app.js"
+    second = tmp_path / "run2" / "app.js"
+    first.parent.mkdir()
+    second.parent.mkdir()
+
+    downloader.fetch_to_file("https://cdn.example/app.js", first, cache_dir=cache_dir)
+    ssl_bypassed = downloader.fetch_to_file("//cdn.example/app.js", second, cache_dir=cache_dir)
+
+    assert calls == [1]
+    assert ssl_bypassed is False
+    assert second.read_bytes() == b"cached-body"
+    # Кэш — копия: изменение файла проекта не портит кэш
+    second.write_bytes(b"rewritten")
+    third = tmp_path / "app.js"
+    downloader.fetch_to_file("https://cdn.example/app.js", third, cache_dir=cache_dir)
+    assert third.read_bytes() == b"cached-body"
+
+
+def test_disk_cache_stores_identical_payloads_once(tmp_path: Path, monkeypatch) -> None:
+    _patch_opener(monkeypatch, lambda: _FakeResponse(b"same"))
+    cache_dir = tmp_path / ".cache"
+
+    downloader.fetch_to_file("https://a.example/x.js?v=1", tmp_path / "x1.js", cache_dir=cache_dir)
+    downloader.fetch_to_file("https://a.example/x.js?v=2", tmp_path / "x2.js", cache_dir=cache_dir)
+
+    assert len(list((cache_dir / "urls").iterdir())) == 2
+    assert len(list((cache_dir / "blobs").iterdir())) == 1
+
+
+def test_prepared_download_rules_resolve_like_raw_rules() -> None:
+    raw = [
+        {"folder": "  ", "extensions": [".css"]},  # без папки — отбрасывается
+        {"folder": "/css/", "extensions": [".CSS"]},
+        {"folder": "misc", "extensions": []},  # без фильтра расширений
+    ]
+    prepared = downloader.prepare_download_rules(raw)
+
+    assert prepared.rules == (("css", frozenset({".css"})), ("misc", None))
+    for url in ("https://cdn.example/a/Style.CSS", "//cdn.example/x.woff2", "data:x"):
+        assert downloader.resolve_download_folder(url, prepared) == (
+            downloader.resolve_download_folder(url, raw)
+        )
+    assert downloader.resolve_download_folder("https://cdn.example/s.css", prepared) == ("css", "s.css")
+    assert downloader.resolve_download_folder("https://cdn.example/f.woff2", prepared) == ("misc", "f.woff2")
+
+
+def test_resolve_download_folder_accepts_tuple_of_raw_rules() -> None:
+    """Кортеж сырых dict — не подготовленные правила: он тоже проходит prepare."""
+    raw = ({"folder": "/css/", "extensions": [".CSS"]}, {"folder": "misc"})
+
+    assert downloader.resolve_download_folder("https://cdn.example/s.css", raw) == ("css", "s.css")
+    assert downloader.resolve_download_folder("https://cdn.example/f.woff2", raw) == ("misc", "f.woff2")
+
+
+def test_download_to_project_streams_into_rule_folder(tmp_path: Path, monkeypatch) -> None:
+    _patch_opener(monkeypatch, lambda: _FakeResponse(b"png-data"))
+
+    result = downloader.download_to_project(
+        "https://static.tildacdn.com/tild1/logo.png",
+        tmp_path,
+        [{"folder": "images", "extensions": [".png"]}],
+    )
+
+    assert result == (tmp_path / "images" / "logo.png", False)
+    assert (tmp_path / "images" / "logo.png").read_bytes() == b"png-data"
+    assert [p.name for p in (tmp_path / "images").iterdir()] == ["logo.png"]
+
+
+class _ResettingResponse(_FakeResponse):
+    """Отдаёт первый блок тела, затем соединение обрывается."""
+
+    def read(self, size: int = -1) -> bytes:
+        if self.tell():
+            raise ConnectionResetError(104, "Connection reset by peer")
+        return super().read(size)
+
+
+def test_fetch_to_file_connection_reset_mid_body_is_not_a_write_error(
+    tmp_path: Path, monkeypatch
+) -> None:
+    _patch_opener(monkeypatch, lambda: _ResettingResponse(b"x" * 10))
+    destination = tmp_path / "app.js"
+
+    with pytest.raises(ConnectionResetError) as excinfo:
+        downloader.fetch_to_file("https://example.com/app.js", destination)
+
+    assert not isinstance(excinfo.value, downloader.DownloadWriteError)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fetch_to_file_reports_disk_failure_as_write_error(tmp_path: Path, monkeypatch) -> None:
+    _patch_opener(monkeypatch, lambda: _FakeResponse(b"body"))
+    destination = tmp_path / "missing-dir" / "app.js"
+
+    with pytest.raises(downloader.DownloadWriteError):
+        downloader.fetch_to_file("https://example.com/app.js", destination)
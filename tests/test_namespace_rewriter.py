@@ -158,3 +158,43 @@ def test_renames_downloaded_tilda_file_and_updates_references(tmp_path: Path) ->
     assert not script.exists()
     assert (tmp_path / "js" / "aida-extra.js").exists()
     assert 'src="js/aida-extra.js"' in page.read_text(encoding="utf-8")
+
+
+def test_renamed_file_inside_renamed_folder_gets_full_new_path(tmp_path: Path) -> None:
+    page = tmp_path / "index.html"
+    page.write_text('<script src="tilda-dir/tilda-a.js"></script>', encoding="utf-8")
+    folder = tmp_path / "tilda-dir"
+    folder.mkdir()
+    (folder / "tilda-a.js").write_text("", encoding="utf-8")
+
+    result = rewrite_project_namespace(tmp_path)
+
+    assert result.renamed_paths == 2
+    assert (tmp_path / "aida-dir" / "aida-a.js").exists()
+    assert 'src="aida-dir/aida-a.js"' in page.read_text(encoding="utf-8")
+
+
+def test_scan_leftovers_reports_most_specific_filename_label(tmp_path: Path) -> None:
+    (tmp_path / "til-x.tilda.css").write_text("", encoding="utf-8")
+    (tmp_path / "tild-y.js").write_text("", encoding="utf-8")
+    (tmp_path / "TIL.png").write_bytes(b"")
+    (tmp_path / "until.txt").write_text("", encoding="utf-8")
+
+    critical, _warnings = scan_leftovers(tmp_path)
+
+    assert critical["filename tilda"] == 1
+    assert critical["filename tild"] == 1
+    assert critical["filename til"] == 1
+
+
+def test_rewrite_leftovers_match_scan_of_rewritten_tree(tmp_path: Path) -> None:
+    (tmp_path / "index.html").write_text(
+        '<div class="t-form"></div>'
+        '<script src="https://static.tildacdn.com/js/x.js"></script>',
+        encoding="utf-8",
+    )
+    (tmp_path / "t-raw.html").write_text("<p>data-tilda-x</p>", encoding="utf-8")
+
+    result = rewrite_project_namespace(tmp_path)
+
+    assert (result.critical_leftovers, result.warning_leftovers) == scan_leftovers(tmp_path)
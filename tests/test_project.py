@@ -102,3 +102,34 @@ def test_update_rename_map_accumulates(tmp_path: Path) -> None:
     ctx.update_rename_map({"b.css": "y.css"})
 
     assert ctx.rename_map == {"a.html": "x.html", "b.css": "y.css"}
+
+
+def test_config_loaders_share_parse_until_file_changes(tmp_path: Path, monkeypatch) -> None:
+    """Новый ConfigLoader на тот же config.yaml не разбирает YAML повторно."""
+    import os
+
+    import yaml
+
+    from core.config_loader import ConfigLoader
+
+    config_path = tmp_path / "config" / "config.yaml"
+    config_path.parent.mkdir()
+    config_path.write_text('patterns:\n  ignore_prefixes: ["mailto:"]\n', encoding="utf-8")
+
+    calls = []
+    real_safe_load = yaml.safe_load
+    monkeypatch.setattr(
+        yaml, "safe_load", lambda text: calls.append(text) or real_safe_load(text)
+    )
+
+    first = ConfigLoader(tmp_path).patterns()
+    second = ConfigLoader(tmp_path).patterns()
+    assert first.ignore_prefixes == second.ignore_prefixes == ["mailto:"]
+    assert len(calls) == 1
+
+    config_path.write_text('patterns:\n  ignore_prefixes: ["tel:"]\n', encoding="utf-8")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert ConfigLoader(tmp_path).patterns().ignore_prefixes == ["tel:"]
+    assert len(calls) == 2
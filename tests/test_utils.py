@@ -34,6 +34,18 @@ def test_safe_read_handles_bom(tmp_path: Path) -> None:
     assert result.endswith("hello")
 
 
+def test_safe_read_translates_newlines_like_read_text(tmp_path: Path) -> None:
+    f = tmp_path / "crlf.html"
+    f.write_bytes(b"a\r\nb\rc\n")
+    assert utils.safe_read(f) == f.read_text(encoding="utf-8") == "a\nb\nc\n"
+
+
+def test_decode_text_matches_safe_read(tmp_path: Path) -> None:
+    f = tmp_path / "mixed.html"
+    f.write_bytes("привет\r\nмир\r".encode("utf-8"))
+    assert utils.decode_text(f.read_bytes()) == utils.safe_read(f) == "привет\nмир\n"
+
+
 def test_safe_read_raises_when_missing(tmp_path: Path) -> None:
     try:
         utils.safe_read(tmp_path / "missing.txt")
@@ -134,6 +146,45 @@ def test_list_files_recursive_case_insensitive_extensions(tmp_path: Path) -> Non
     assert len(files) == 2
 
 
+def test_list_files_recursive_matches_path_suffix_semantics(tmp_path: Path) -> None:
+    """Dot-файл ".html" без расширения не считается HTML — как Path.suffix."""
+    (tmp_path / ".html").touch()
+    (tmp_path / ".page.html").touch()
+    (tmp_path / "page.HTML").touch()
+
+    files = utils.list_files_recursive(tmp_path, extensions=(".html",))
+    assert sorted(f.name for f in files) == [".page.html", "page.HTML"]
+
+
+def test_file_contains_any(tmp_path: Path) -> None:
+    f = tmp_path / "app.js"
+    f.write_text('load("Photo.JPG")', encoding="utf-8")
+    empty = tmp_path / "empty.js"
+    empty.touch()
+
+    assert utils.file_contains_any(f, [b"missing", b"Photo.JPG"])
+    assert not utils.file_contains_any(f, [b"photo.jpg"])
+    assert not utils.file_contains_any(f, [])
+    assert not utils.file_contains_any(empty, [b"x"])
+
+
+def test_iter_files_yields_posix_relative_paths(tmp_path: Path) -> None:
+    (tmp_path / "a.html").touch()
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "sub" / "deep" / "b.css").touch()
+
+    items = sorted(relative for _entry, relative in utils.iter_files(tmp_path))
+    assert items == ["a.html", "sub/deep/b.css"]
+
+
+def test_iter_files_include_dirs_yields_folders(tmp_path: Path) -> None:
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "sub" / "deep" / "b.css").touch()
+
+    items = sorted(relative for _entry, relative in utils.iter_files(tmp_path, include_dirs=True))
+    assert items == ["sub", "sub/deep", "sub/deep/b.css"]
+
+
 def test_get_elapsed_time_seconds() -> None:
     start = time.time() - 5.5
     result = utils.get_elapsed_time(start)
@@ -12,7 +12,9 @@ Options:
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
+import os
 import re
 import subprocess
 import sys
@@ -29,10 +31,18 @@ def _load_manifest() -> dict:
 
 
 def _save_manifest(data: dict) -> None:
-    MANIFEST_PATH.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    # Пишем во временный файл рядом и подменяем через os.replace —
+    # прерванная запись не оставит обрезанный manifest.json
+    tmp_path = MANIFEST_PATH.with_suffix(".json.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", newline="\n") as handle:
+            json.dump(data, handle, indent=2, ensure_ascii=False)
+            handle.write("\n")
+        os.replace(tmp_path, MANIFEST_PATH)
+    finally:
+        # После успешного os.replace временного файла уже нет
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
 
 
 def _parse_version(version_str: str) -> tuple[int, int, int]: